@@ -0,0 +1,85 @@
+"""
+Record `-X importtime` startup cost of pyflash commands.
+
+    $ python benchmarks/startup.py --output startup.json
+    $ python benchmarks/startup.py --compare startup.json
+
+Each command module is imported in a fresh interpreter, on top of
+`pyflash.cli`, so the numbers are what a user pays before the command runs.
+"""
+import argparse
+import json
+import os
+import pkgutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pyflash.commands  # noqa
+from pyflash.commands import profile  # noqa
+
+
+def import_time(module):
+    """
+    Return cumulative import time of `module` in microseconds.
+    """
+    try:
+        timings = profile.import_profile(['pyflash.cli', module])
+    except RuntimeError:
+        return None
+    return sum(t['cumulative'] for t in timings.values() if t['parent'] is None)
+
+
+def run(repeat):
+    modules = ['pyflash.cli']
+    modules += ['pyflash.commands.' + m.name for m in pkgutil.iter_modules(pyflash.commands.__path__)]
+    report = {}
+    for module in modules:
+        timings = [import_time(module) for _ in range(repeat)]
+        if None in timings:
+            report[module] = None
+            continue
+        report[module] = min(timings)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', '-r', type=int, default=5)
+    parser.add_argument('--output', '-o', default=None)
+    parser.add_argument('--compare', '-c', default=None)
+    parser.add_argument('--threshold', '-t', type=float, default=1.2,
+                        help='Flag modules slower than baseline by this factor.')
+    args = parser.parse_args()
+
+    report = run(args.repeat)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+
+    regressions = []
+    for module, us in report.items():
+        if us is None:
+            print('{:40} {:>10}'.format(module, 'failed'))
+            continue
+        row = '{:40} {:>8.1f}ms'.format(module, us / 1000)
+        old = baseline.get(module)
+        if old:
+            row += ' ({:+.1f}ms)'.format((us - old) / 1000)
+            if us > old * args.threshold:
+                regressions.append(module)
+                row += ' REGRESSION'
+        print(row)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=4)
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Persistent key value cache backed by SQLite.
+
+Entries live in namespaces (omdbapi, ebook_meta, ...) and can expire after
+a TTL. Each namespace holds up to `max_entries`, or its own limit, and the
+least recently used entries of a namespace are evicted in batches once it
+grows past that. Every write is a SQLite transaction, so a crash can't
+corrupt the cache.
+"""
+import logging
+import math
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB,
+    expires REAL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+DROP INDEX IF EXISTS cache_accessed;
+CREATE INDEX IF NOT EXISTS cache_namespace_accessed ON cache (namespace, accessed);
+"""
+
+# namespaces holding an entry per file get room of their own, so a big
+# photo library can't evict movie ratings
+LIMITS = {
+    'file_hash': 1000000,
+    'dhash': 500000,
+    'subtitle_videos': 500000,
+}
+# eviction trims a namespace to this share of its limit, so it runs once in
+# many writes instead of on every one
+LOW_WATER = 0.9
+BATCH = 500
+
+
+class Cache:
+    def __init__(self, path, max_entries=100000, limits=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.limits = dict(LIMITS, **(limits or {}))
+        self._connect()
+
+    def _connect(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._counts = {}
+
+    # SQLite connections can't be shared across fork, so forked workers
+    # open a connection of their own on first use
+    @property
+    def lock(self):
+        if self._pid != os.getpid():
+            self._connect()
+        return self._lock
+
+    @property
+    def conn(self):
+        if self._pid != os.getpid():
+            self._connect()
+        return self._conn
+
+    def limit(self, namespace):
+        return self.limits.get(namespace, self.max_entries)
+
+    def get(self, namespace, key, default=None):
+        return self.get_many(namespace, [key]).get(str(key), default)
+
+    def get_many(self, namespace, keys):
+        """
+        Return {key: value} of the keys found, in one transaction.
+        """
+        now = time.time()
+        keys = [str(key) for key in keys]
+        found = {}
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                expired = []
+                for start in range(0, len(keys), BATCH):
+                    batch = keys[start:start + BATCH]
+                    rows = self.conn.execute(
+                        'SELECT key, value, expires FROM cache WHERE namespace = ? AND key IN ({})'.format(
+                            ','.join('?' * len(batch))),
+                        [namespace] + batch,
+                    )
+                    for key, value, expires in rows:
+                        if expires is not None and expires < now:
+                            expired.append((namespace, key))
+                        else:
+                            found[key] = value
+                self.conn.executemany('DELETE FROM cache WHERE namespace = ? AND key = ?', expired)
+                if namespace in self._counts:
+                    self._counts[namespace] -= len(expired)
+                self.conn.executemany(
+                    'UPDATE cache SET accessed = ? WHERE namespace = ? AND key = ?',
+                    [(now, namespace, key) for key in found],
+                )
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        return {key: pickle.loads(value) for key, value in found.items()}
+
+    def set(self, namespace, key, value, ttl=None):
+        self.set_many(namespace, [(key, value)], ttl)
+
+    def set_many(self, namespace, items, ttl=None):
+        """
+        Store (key, value) pairs in one transaction.
+        """
+        now = time.time()
+        expires = now + ttl if ttl else None
+        rows = [(pickle.dumps(value), expires, now, namespace, str(key)) for key, value in items]
+        with self.lock:
+            count = self._count(namespace)
+            self.conn.execute('BEGIN')
+            try:
+                for row in rows:
+                    # only new keys grow the namespace, replaced ones don't
+                    if not self.conn.execute(
+                        'UPDATE cache SET value = ?, expires = ?, accessed = ? WHERE namespace = ? AND key = ?', row,
+                    ).rowcount:
+                        self.conn.execute(
+                            'INSERT INTO cache (value, expires, accessed, namespace, key) VALUES (?, ?, ?, ?, ?)', row,
+                        )
+                        count += 1
+                self._counts[namespace] = count
+                if count > self.limit(namespace):
+                    self._evict(namespace)
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self._counts.pop(namespace, None)
+                self.conn.execute('ROLLBACK')
+                raise
+
+    def delete(self, namespace, key):
+        with self.lock:
+            deleted = self.conn.execute(
+                'DELETE FROM cache WHERE namespace = ? AND key = ?', (namespace, str(key)),
+            ).rowcount
+            if namespace in self._counts:
+                self._counts[namespace] -= deleted
+
+    def keys(self, namespace):
+        with self.lock:
+            rows = self.conn.execute('SELECT key FROM cache WHERE namespace = ?', (namespace,))
+            return [row[0] for row in rows]
+
+    def __len__(self):
+        return self.conn.execute('SELECT count(*) FROM cache').fetchone()[0]
+
+    def _count(self, namespace):
+        if namespace not in self._counts:
+            self._counts[namespace] = self.conn.execute(
+                'SELECT count(*) FROM cache WHERE namespace = ?', (namespace,),
+            ).fetchone()[0]
+        return self._counts[namespace]
+
+    def _evict(self, namespace):
+        count = self._counts[namespace]
+        count -= self.conn.execute(
+            'DELETE FROM cache WHERE namespace = ? AND expires < ?', (namespace, time.time()),
+        ).rowcount
+        keep = math.ceil(self.limit(namespace) * LOW_WATER)
+        if count > keep:
+            count -= self.conn.execute(
+                'DELETE FROM cache WHERE rowid IN '
+                '(SELECT rowid FROM cache WHERE namespace = ? ORDER BY accessed LIMIT ?)',
+                (namespace, count - keep),
+            ).rowcount
+        self._counts[namespace] = count
+
+    def migrate(self, pickle_file):
+        """
+        Import entries of the old `{namespace: {key: value}}` pickle cache.
+        """
+        try:
+            with open(pickle_file, 'rb') as fh:
+                data = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.error('Unable to migrate {}: {}'.format(pickle_file, e))
+            return
+        now = time.time()
+        rows = [
+            (namespace, str(key), pickle.dumps(value), None, now)
+            for namespace, entries in data.items()
+            for key, value in entries.items()
+        ]
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.executemany('INSERT OR IGNORE INTO cache VALUES (?, ?, ?, ?, ?)', rows)
+            self.conn.execute('COMMIT')
+            self._counts = {}
+        os.rename(pickle_file, pickle_file + '.bak')
+        logger.info('Migrated {} entries from {}'.format(len(rows), pickle_file))
+
+    def close(self):
+        self.conn.close()
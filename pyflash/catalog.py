@@ -0,0 +1,215 @@
+"""
+SQLite catalog of media files.
+
+Holds the guessit result and the OMDb entry of every video under the
+scanned directories. Directories whose mtime didn't change since the
+last update are not listed again, only their known files are checked for
+changes. Only new or changed files are parsed with guessit and that
+happens on a process pool.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+RACY_NS = 2 * 10 ** 9
+VIDEO_EXTENSIONS = ('.mkv', '.mp4', '.avi', '.m4v', '.mov', '.wmv', '.webm', '.mpg', '.mpeg', '.ts', '.flv')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    subdirs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    title TEXT,
+    guess TEXT,
+    imdb_id TEXT
+);
+CREATE INDEX IF NOT EXISTS files_directory ON files (directory);
+CREATE INDEX IF NOT EXISTS files_title ON files (title);
+CREATE TABLE IF NOT EXISTS movies (
+    imdb_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def parse(path):
+    """
+    Return (title, guessit result as JSON) of a video.
+    """
+    import guessit
+
+    try:
+        guess = guessit.guessit(os.path.basename(path))
+    except Exception as e:
+        logger.error('Unable to parse {}: {}'.format(path, e))
+        return None, None
+    return guess.get('title'), json.dumps(dict(guess), default=str)
+
+
+def _subtree(path):
+    # every path below `path`, '0' is the character after '/'
+    return path + os.sep, path + chr(ord(os.sep) + 1)
+
+
+class Catalog:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def _forget(self, directory):
+        low, high = _subtree(directory)
+        self.conn.execute('DELETE FROM dirs WHERE path = ? OR path BETWEEN ? AND ?', (directory, low, high))
+        self.conn.execute('DELETE FROM files WHERE path BETWEEN ? AND ?', (low, high))
+
+    def _scan(self, root):
+        """
+        Walk directories changed since the last scan. Returns files to parse
+        as [(path, directory, size, mtime_ns)] and the directory rows to
+        save once they are parsed.
+        """
+        started = time.time_ns()
+        pending = []
+        dirs = []
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                self._forget(directory)
+                continue
+            row = self.conn.execute('SELECT mtime_ns, subdirs FROM dirs WHERE path = ?', (directory,)).fetchone()
+            if row and row[0] == mtime_ns:
+                # files edited in place don't change the directory mtime
+                pending.extend(self._changed_files(directory))
+                stack.extend(json.loads(row[1]))
+                continue
+
+            subdirs = []
+            files = {}
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(VIDEO_EXTENSIONS):
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError as e:
+                logger.error(e)
+                continue
+
+            known = dict(
+                (path, (size, mtime))
+                for path, size, mtime in self.conn.execute(
+                    'SELECT path, size, mtime_ns FROM files WHERE directory = ?', (directory,),
+                )
+            )
+            for path in set(known) - set(files):
+                self.conn.execute('DELETE FROM files WHERE path = ?', (path,))
+            for path, key in files.items():
+                if known.get(path) != key:
+                    pending.append((path, directory) + key)
+            old = self.conn.execute('SELECT subdirs FROM dirs WHERE path = ?', (directory,)).fetchone()
+            for subdir in set(json.loads(old[0]) if old else []) - set(subdirs):
+                self._forget(subdir)
+            # a file added in the same mtime tick as this listing would be
+            # missed, so recently changed directories are listed again
+            if mtime_ns > started - RACY_NS:
+                mtime_ns = -1
+            dirs.append((directory, mtime_ns, json.dumps(subdirs)))
+            stack.extend(subdirs)
+        return pending, dirs
+
+    def _changed_files(self, directory):
+        """
+        Known files of a directory whose size or mtime changed.
+        """
+        changed = []
+        rows = self.conn.execute('SELECT path, size, mtime_ns FROM files WHERE directory = ?', (directory,))
+        for path, size, mtime_ns in rows.fetchall():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.conn.execute('DELETE FROM files WHERE path = ?', (path,))
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                changed.append((path, directory, stat.st_size, stat.st_mtime_ns))
+        return changed
+
+    def update(self, root, jobs=None):
+        """
+        Bring the catalog of `root` up to date, returns the number of
+        parsed files.
+        """
+        root = os.path.abspath(root)
+        with self.lock, self.conn:
+            pending, dirs = self._scan(root)
+
+        results = []
+        if pending:
+            logger.info('Parsing {} new files'.format(len(pending)))
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(parse, [p[0] for p in pending], chunksize=64))
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO files (path, directory, size, mtime_ns, title, guess) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [p + r for p, r in zip(pending, results)],
+            )
+            # directories are saved last, an interrupted update lists them again
+            self.conn.executemany('INSERT OR REPLACE INTO dirs (path, mtime_ns, subdirs) VALUES (?, ?, ?)', dirs)
+        return len(pending)
+
+    def files(self, root):
+        """
+        Return [(path, title, imdb_id)] of videos under `root`.
+        """
+        low, high = _subtree(os.path.abspath(root))
+        with self.lock:
+            return self.conn.execute(
+                'SELECT path, title, imdb_id FROM files WHERE path BETWEEN ? AND ? ORDER BY path', (low, high),
+            ).fetchall()
+
+    def set_movie(self, title, data):
+        """
+        Link videos titled `title` to an OMDb entry.
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO movies (imdb_id, data) VALUES (?, ?)', (data['imdbID'], json.dumps(data)),
+            )
+            self.conn.execute('UPDATE files SET imdb_id = ? WHERE title = ?', (data['imdbID'], title))
+
+    def movies(self, root):
+        """
+        Return OMDb entries of videos under `root`, one per video.
+        """
+        low, high = _subtree(os.path.abspath(root))
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT movies.data FROM files JOIN movies ON files.imdb_id = movies.imdb_id '
+                'WHERE files.path BETWEEN ? AND ? ORDER BY files.path', (low, high),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self.conn.close()
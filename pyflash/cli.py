@@ -1,19 +1,31 @@
-import click
+import logging
+import sys
 
-from . import core
+import click
 
 
 @click.group()
 def cli():
-    pass
+    logging.basicConfig(
+        stream=sys.stdout, level=logging.INFO,
+        format='%(name)s - %(levelname)s - %(message)s',
+    )
 
 
 @cli.command()
-def adb_connect(interface=None):
+@click.option('--interface', '-i', default=None)
+@click.option('--network', '-n', default=None,
+              help='Network to scan, defaults to the /24 of the interface.')
+@click.option('--port', '-p', default=5555)
+@click.option('--timeout', '-t', default=1.0, help='Seconds to wait for each host.')
+@click.option('--concurrency', '-c', default=256, help='Hosts probed at once.')
+@click.option('--rescan', is_flag=True, help='Scan the network even if known devices are up.')
+def adb_connect(interface, network, port, timeout, concurrency, rescan):
     """
     Scan network and connect to adb via network.
     """
-    core.adb_connect(interface)
+    from .commands import adb
+    adb.adb_connect(interface, network, port, timeout, concurrency, rescan)
 
 
 @cli.command()
@@ -21,39 +33,111 @@ def adb_connect(interface=None):
               help='Enter source location.')
 @click.option('--destination', '-d', default='~/Dropbox/books/',
               help='Enter destination location.')
-def send_to_kindle(source, destination):
+@click.option('--jobs', '-j', default=None, type=int,
+              help='Number of books to convert in parallel.')
+def send_to_kindle(source, destination, jobs):
     """
     Send books to kindle via Dropbox/IFTTT.
     """
-    core.send_to_kindle(source, destination)
+    from .commands import books
+    books.send_to_kindle(source, destination, jobs)
 
 
 @cli.command()
 @click.option('--directory', '-d', default=None)
-def fix_imports(directory):
+@click.option('--since', default=None, type=click.Choice(['last-run', 'git']),
+              help='Only fix files changed since the last run or the last git commit.')
+@click.option('--jobs', '-j', default=None, type=int)
+def fix_imports(directory, since, jobs):
     """
     Fix imports in a python project.
     """
-    core.fix_imports(directory)
+    from .commands import dev
+    dev.fix_imports(directory, since, jobs)
 
 
 @cli.command()
-def fix_build(directory=None):
+@click.option('--since', default=None, type=click.Choice(['last-run', 'git']),
+              help='Only fix files changed since the last run or the last git commit.')
+@click.option('--jobs', '-j', default=None, type=int)
+def fix_build(since, jobs, directory=None):
     """
     Fix a failing CI build.
     """
-    core.fix_build(directory)
+    from .commands import dev
+    dev.fix_build(directory, since, jobs)
+
+
+@cli.command()
+@click.option('--directory', '-d', default=None, help='Project root.')
+@click.option('--entry', '-e', multiple=True, help='Entry point module, defaults to __main__ modules.')
+@click.option('--top', '-n', default=10, help='Number of fan-in/fan-out hot spots to show.')
+@click.option('--lazy', is_flag=True, help='Follow imports inside functions too.')
+@click.option('--json', 'as_json', is_flag=True, help='Print report as JSON.')
+@click.option('--jobs', '-j', default=None, type=int)
+def import_graph(directory, entry, top, lazy, as_json, jobs):
+    """
+    Show import cycles, hot spots and entry point closures of a project.
+    """
+    from .commands import graph
+    graph.import_graph(directory, entry, top, lazy, as_json, jobs)
+
+
+@cli.command()
+@click.argument('target')
+@click.option('--repeat', '-r', default=1, help='Keep the fastest of these many runs.')
+@click.option('--top', '-n', default=15)
+@click.option('--output', '-o', default=None, help='Save profile as JSON.')
+@click.option('--compare', '-c', default=None, help='Compare with a saved JSON profile.')
+def import_profile(target, repeat, top, output, compare):
+    """
+    Profile import time of a module or a pyflash command.
+    """
+    from .commands import profile
+    profile.import_profile_command(target, repeat, top, output, compare)
 
 
 @cli.command()
 @click.option('--from_date', '-f', default=None)
 @click.option('--to_date', '-t', default=None)
 @click.option('--state', '-s', default=None)
-def download_imd_data(from_date, to_date, state):
+@click.option('--jobs', '-j', default=None, type=int,
+              help='Number of parallel downloads.')
+@click.option('--chunk-days', '-c', default=31,
+              help='Download long date ranges in chunks of these many days.')
+def download_imd_data(from_date, to_date, state, jobs, chunk_days):
     """
     Download IMD data for given range.
     """
-    core.download_imd_data(from_date, to_date, state)
+    from .commands import imd
+    imd.download_imd_data(from_date, to_date, state, jobs, chunk_days)
+
+
+@cli.command()
+@click.option('--data-dir', '-d', default='data', help='Directory of downloaded IMD csv files.')
+@click.option('--store', '-s', default='imd_store', help='Directory of the columnar store.')
+def imd_store(data_dir, store):
+    """
+    Append downloaded IMD data to a columnar store.
+    """
+    from .commands import imd_store
+    count = imd_store.ingest(data_dir, store)
+    print('Ingested {} files'.format(count))
+
+
+@cli.command()
+@click.option('--store', '-s', default='imd_store')
+@click.option('--station', default=None)
+@click.option('--variable', '-v', required=True)
+@click.option('--from_date', '-f', default=None)
+@click.option('--to_date', '-t', default=None)
+@click.option('--agg', '-a', default='mean', type=click.Choice(['mean', 'max', 'min', 'sum', 'count']))
+def imd_query(store, station, variable, from_date, to_date, agg):
+    """
+    Show daily aggregates of IMD data.
+    """
+    from .commands import imd_store
+    imd_store.imd_query(store, station, variable, from_date, to_date, agg)
 
 
 @cli.command()
@@ -62,7 +146,8 @@ def ipa_install(ipa):
     """
     Resign & install iOS apps.
     """
-    core.ipa_install(ipa)
+    from .commands import ios
+    ios.ipa_install(ipa)
 
 
 @cli.command()
@@ -74,17 +159,23 @@ def ocr(engine, file_name, language, output_dir):
     """
     Run given OCR engine on given image.
     """
-    core.ocr(engine, file_name, language, output_dir)
+    from .commands import ocr
+    ocr.ocr(engine, file_name, language, output_dir)
 
 
 @cli.command()
-@click.option('--source', '-s')
+@click.option('--source', '-s', help='Pdf file or a directory of pdf files.')
 @click.option('--destination', '-d', default=None)
-def split_pdf(source, destination):
+@click.option('--jobs', '-j', default=None, type=int,
+              help='Number of processes to use.')
+@click.option('--chunk-size', '-c', default=100,
+              help='Pages split by each process at a time.')
+def split_pdf(source, destination, jobs, chunk_size):
     """
     Split pdf horizontally/vertically.
     """
-    core.split_pdf(source, destination)
+    from .commands import pdf
+    pdf.split(source, destination, jobs, chunk_size)
 
 
 @cli.command()
@@ -93,73 +184,153 @@ def download_book(book):
     """
     Search and download book by name
     """
-    core.download_book(book)
+    from .commands import books
+    books.download_book(book)
 
 
 @cli.command()
 @click.option('--directory', '-d', default=None)
-def organize_books(directory):
+@click.option('--jobs', '-j', default=None, type=int,
+              help='Number of books to read in parallel.')
+def organize_books(directory, jobs):
     """
     Organize books in a specified directory.
     """
-    core.organize_books(directory)
+    from .commands import books
+    books.organize_books(directory, jobs)
 
 
 @cli.command()
-def organize_photos(directory=None):
+@click.option('--directory', '-d', default=None)
+@click.option('--dry-run', '-n', is_flag=True, help='Only show the renames.')
+@click.option('--jobs', '-j', default=None, type=int,
+              help='Number of exiftool processes.')
+def organize_photos(directory, dry_run, jobs):
     """
     Organize photos by date.
     """
-    core.organize_photos(directory)
+    from .commands import organize
+    organize.organize_photos(directory, dry_run, jobs)
+
+
+@cli.command()
+@click.argument('directories', nargs=-1)
+@click.option('--min-size', '-m', default=1, help='Ignore files smaller than these many bytes.')
+@click.option('--action', '-a', default=None, type=click.Choice(['hardlink', 'delete']),
+              help='Replace duplicates with hardlinks or delete them.')
+@click.option('--jobs', '-j', default=None, type=int,
+              help='Number of files to hash in parallel.')
+def find_duplicates(directories, min_size, action, jobs):
+    """
+    Find duplicate files and the space they waste.
+    """
+    from .commands import duplicates
+    duplicates.find_duplicates_command(directories, min_size, action, jobs)
 
 
 @cli.command()
-def organize_downloads(directory=None):
+@click.argument('directories', nargs=-1)
+@click.option('--distance', '-k', default=4,
+              help='Maximum number of differing hash bits of similar photos.')
+@click.option('--jobs', '-j', default=None, type=int,
+              help='Number of processes hashing photos.')
+def find_similar_photos(directories, distance, jobs):
+    """
+    Find resized or recompressed copies of photos.
+    """
+    from .commands import similar
+    similar.find_similar_photos(directories, distance, jobs)
+
+
+@cli.command()
+@click.option('--directory', '-d', default=None)
+@click.option('--watch', '-w', is_flag=True,
+              help='Keep running and relocate new downloads as they finish.')
+@click.option('--debounce', default=2.0,
+              help='Seconds a download must stay unchanged before it is moved.')
+@click.option('--interval', default=60.0,
+              help='Seconds between scans where inotify is not available.')
+def organize_downloads(directory, watch, debounce, interval):
     """
     Organize downloaded files.
     """
-    core.organize_downloads(directory)
+    from .commands import organize
+    organize.organize_downloads(directory, watch, debounce, interval)
 
 
 @cli.command()
-def download_subtitles(directory=None):
+@click.option('--directory', '-d', default=None)
+@click.option('--jobs', '-j', default=4,
+              help='Number of concurrent subtitle searches.')
+def download_subtitles(directory, jobs):
     """
     Download subtitles for videos in a directory.
     """
-    core.download_subtitles(directory)
+    from .commands import subtitles
+    subtitles.download_subtitles(directory, jobs)
 
 
 @cli.command()
 @click.option('--sort', '-s', default=None)
-def rate_movies(sort, directory=None):
+@click.option('--jobs', '-j', default=None, type=int,
+              help='Number of concurrent OMDb requests.')
+@click.option('--rate', '-r', default=None, type=float,
+              help='Maximum OMDb requests per second.')
+def rate_movies(sort, jobs, rate, directory=None):
     """
     Show IMDb/RT ratings for movies and series.
     """
     print(sort)
-    core.rate_movies(directory, sort)
+    from .commands import movies
+    movies.rate_movies(directory, sort, jobs, rate)
 
 
 @cli.command()
-def rent_receipts():
+@click.option('--csv', 'csv_file', default=None,
+              help='Generate receipts for tenants in a csv with name, amount, owner_name, address and year columns.')
+@click.option('--output-dir', '-o', default='.', help='Directory of per receipt pdfs.')
+@click.option('--combined', default=None, help='Write all receipts to this pdf instead.')
+@click.option('--jobs', '-j', default=None, type=int)
+def rent_receipts(csv_file, output_dir, combined, jobs):
     """
     Generate monthly rent receipts for a given FY.
     """
+    if csv_file:
+        from .commands import rent
+        rent.batch_rent_receipts(csv_file, output_dir, combined, jobs)
+        return
     name = input('Your name [Example: Raj Kumar]: ')
     amount = input('Rent amount [Ex: 8,000]: ')
     owner_name = input('Owner name [Ex: Sekhar Raju]: ')
     address = input('Address [Ex: #26, Gandhi Road, Bangalore]: ')
     year = input('Year [Ex: 2016-17]: ')
     year = int(year[:4])
-    core.rent_receipts(name, amount, owner_name, address, year)
+    from .commands import rent
+    try:
+        rent.rent_receipts(name, amount, owner_name, address, year)
+    except ValueError as e:
+        raise click.ClickException(str(e))
 
 
 @cli.command()
 @click.option('--number', '-n', default=None)
-def validate_aadhaar(number):
+@click.option('--file', '-f', 'source', default=None, help='File with a number per line, - for stdin.')
+@click.option('--column', '-c', default=None, help='Validate this column, index or header name, of a csv.')
+@click.option('--valid', default=None, help='Write valid lines to this file.')
+@click.option('--invalid', default=None, help='Write invalid lines to this file.')
+@click.option('--jobs', '-j', default=None, type=int)
+def validate_aadhaar(number, source, column, valid, invalid, jobs):
     """
     Check if given AADHAAR number is valid or not.
     """
-    core.validate_aadhaar(number)
+    from .commands import aadhaar
+    if source:
+        try:
+            aadhaar.validate_aadhaar_file(source, valid, invalid, column, jobs)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--column')
+        return
+    aadhaar.validate_aadhaar(number)
 
 
 @cli.command()
@@ -168,7 +339,8 @@ def procfile(file):
     """
     Start processes in Procfile
     """
-    core.procfile(file)
+    from .commands import procfile
+    procfile.procfile(file)
 
 
 @cli.command()
@@ -176,7 +348,7 @@ def nsedb():
     """
     Create/Sync NSE stocks OHLC data.
     """
-    core.nsedb()
+    raise click.ClickException('nsedb is not implemented yet.')
 
 
 @cli.command()
@@ -184,7 +356,8 @@ def otp():
     """
     Show OTP
     """
-    core.otp()
+    from .commands import otp
+    otp.otp()
 
 
 @cli.command()
@@ -195,7 +368,8 @@ def pg_stats(uri,column, duration):
     """
     Show stats for postgres database.
     """
-    core.pg_stats(uri, column, duration)
+    from .commands import pg
+    pg.pg_stats(uri, column, duration)
 
 
 @cli.command()
@@ -205,4 +379,5 @@ def python_version_readiness(python, number):
     """
     Show version readiness of top python packages.
     """
-    core.python_version_readiness(python, number)
+    from .commands import readiness
+    readiness.python_version_readiness(python, number)
@@ -0,0 +1,202 @@
+"""
+Validate AADHAAR numbers with the Verhoeff checksum.
+
+Files are validated in bulk with pyflash.verhoeff, which needs NumPy and
+is only imported for them. Large inputs are split into chunks of whole
+lines or csv records that are validated on all cores.
+"""
+import collections
+import csv
+import functools
+import io
+import logging
+import os
+import sys
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def read_chunks(fh, size=None, quoted=False):
+    """
+    Yield chunks of whole lines from a binary file. With `quoted`, chunks
+    don't end inside a quoted csv field holding newlines.
+    """
+    size = size or CHUNK_SIZE
+    rest = b''
+    while True:
+        data = fh.read(size)
+        if not data:
+            break
+        data = rest + data
+        end = data.rfind(b'\n') + 1
+        # chunks start at a record, so an odd number of quotes means the
+        # newline is inside a field
+        while quoted and end and data.count(b'"', 0, end) % 2:
+            end = data.rfind(b'\n', 0, end - 1) + 1
+        rest = data[end:]
+        if end:
+            yield data[:end]
+    if rest:
+        yield rest if rest.endswith(b'\n') else rest + b'\n'
+
+
+def map_chunks(func, chunks, jobs=None):
+    """
+    Yield func(chunk) of chunks in order. A few chunks are in flight on a
+    process pool at a time, so the input is never read whole.
+    """
+    jobs = jobs or os.cpu_count()
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    second = next(chunks, None)
+    if jobs == 1 or second is None:
+        for chunk in filter(None, (first, second)):
+            yield func(chunk)
+        yield from map(func, chunks)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = collections.deque([pool.submit(func, first), pool.submit(func, second)])
+        for chunk in chunks:
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+            pending.append(pool.submit(func, chunk))
+        while pending:
+            yield pending.popleft().result()
+
+
+def validate_lines(fh, valid_fh, invalid_fh, jobs=None):
+    """
+    Validate a number per line, returns (valid, invalid) counts.
+    """
+    from .. import verhoeff
+
+    counts = [0, 0]
+    for result in map_chunks(verhoeff.validate_chunk, read_chunks(fh), jobs):
+        for i, (out, data) in enumerate(zip((valid_fh, invalid_fh), result)):
+            counts[i] += data.count(b'\n')
+            if out:
+                out.write(data)
+    return counts
+
+
+def csv_records(data):
+    """
+    Split newline terminated csv data into records as they are in the file.
+    """
+    lines = data.split(b'\n')[:-1]
+    if b'"' not in data:
+        return lines
+    records = []
+    current = []
+    quoted = False
+    for line in lines:
+        current.append(line)
+        # a line with an odd number of quotes opens or closes a field
+        quoted ^= line.count(b'"') % 2 == 1
+        if not quoted:
+            records.append(b'\n'.join(current))
+            current = []
+    if current:
+        records.append(b'\n'.join(current))
+    return records
+
+
+def csv_numbers(data, records, column):
+    """
+    Return values of `column` of the records, one per line.
+    """
+    if b'"' not in data:
+        fields = (record.split(b',', column + 1) for record in records)
+        return b'\n'.join([f[column] if len(f) > column else b'' for f in fields]) + b'\n'
+
+    rows = list(csv.reader(io.StringIO(data.decode('utf-8', 'surrogateescape'), newline='')))
+    if len(rows) != len(records):
+        # csv also ends records at a lone \r, parse them one by one then
+        rows = [
+            next(csv.reader(io.StringIO(record.decode('utf-8', 'surrogateescape'), newline='')), [])
+            for record in records
+        ]
+    # a newline would split a number into two lines
+    values = [row[column].replace('\n', ' ') if len(row) > column else '' for row in rows]
+    return '\n'.join(values).encode('utf-8', 'surrogateescape') + b'\n'
+
+
+def validate_csv_chunk(data, column):
+    """
+    Split csv records of data into (valid, invalid, valid count, invalid
+    count) by the number in `column`. Records are written as they are in
+    the input, the ones without a number are left out.
+    """
+    from .. import verhoeff
+
+    records = csv_records(data)
+    status = verhoeff.line_status(csv_numbers(data, records, column)).tolist()
+    valid = b''.join([record + b'\n' for record, ok in zip(records, status) if ok == 1])
+    invalid = b''.join([record + b'\n' for record, ok in zip(records, status) if ok == 0])
+    return valid, invalid, status.count(1), status.count(0)
+
+
+def validate_csv(fh, valid_fh, invalid_fh, column, jobs=None):
+    """
+    Validate numbers in a column, given by index or header name, of a csv.
+    """
+    outputs = (valid_fh, invalid_fh)
+    if not column.isdigit():
+        header = fh.readline()
+        while header.count(b'"') % 2:
+            more = fh.readline()
+            if not more:
+                break
+            header += more
+        names = next(csv.reader(io.StringIO(header.decode('utf-8', 'surrogateescape'), newline='')), [])
+        names = [name.strip() for name in names]
+        if column not in names:
+            raise ValueError('No column {!r} in the csv header, columns are {}'.format(column, ', '.join(names)))
+        column = names.index(column)
+        for out in filter(None, outputs):
+            out.write(header)
+
+    validate = functools.partial(validate_csv_chunk, column=int(column))
+    counts = [0, 0]
+    for valid, invalid, valid_count, invalid_count in map_chunks(validate, read_chunks(fh, quoted=True), jobs):
+        counts[0] += valid_count
+        counts[1] += invalid_count
+        for out, data in zip(outputs, (valid, invalid)):
+            if out:
+                out.write(data)
+    return counts
+
+
+def validate_aadhaar_file(source, valid=None, invalid=None, column=None, jobs=None):
+    fh = sys.stdin.buffer if source == '-' else open(source, 'rb')
+    outputs = [open(path, 'wb') if path else None for path in (valid, invalid)]
+    try:
+        if column is not None:
+            counts = validate_csv(fh, outputs[0], outputs[1], column, jobs)
+        else:
+            counts = validate_lines(fh, outputs[0], outputs[1], jobs)
+    finally:
+        for out in outputs + [fh]:
+            if out and out is not sys.stdin.buffer:
+                out.close()
+    print('Valid: {}, Invalid: {}'.format(*counts))
+    return counts
+
+
+def validate_aadhaar(number):
+    if not number or len(number) != 12:
+        print('Enter 12 digit AADHAR numner')
+        sys.exit()
+
+    if u.validateVerhoeff(number):
+        print('Valid AADHAR number')
+    else:
+        print('Invalid AADHAR number')
@@ -0,0 +1,85 @@
+"""
+Find devices with adb over network enabled and connect to them.
+
+All hosts of the network are probed at once with asyncio TCP connects, so
+a scan takes about one timeout. Devices found are cached and tried first
+on the next run.
+"""
+import asyncio
+import ipaddress
+import logging
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+
+async def is_open(host, port, timeout, semaphore):
+    async with semaphore:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+
+async def scan(hosts, port, timeout=1, concurrency=256):
+    """
+    Return hosts accepting connections on port.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(is_open(host, port, timeout, semaphore) for host in hosts))
+    return [host for host, up in zip(hosts, results) if up]
+
+
+async def connect(host, port):
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            'adb', 'connect', '{}:{}'.format(host, port),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+        )
+    except OSError as e:
+        return 'Unable to run adb: {}'.format(e)
+    out, _ = await proc.communicate()
+    return out.decode('utf-8').strip()
+
+
+async def scan_and_connect(hosts, known, port, timeout, concurrency):
+    devices = []
+    if known:
+        devices = await scan(known, port, timeout, concurrency)
+    if not devices:
+        logger.info('Scanning {} hosts for port {}'.format(len(hosts), port))
+        devices = await scan(hosts, port, timeout, concurrency)
+    outputs = await asyncio.gather(*(connect(host, port) for host in devices))
+    return devices, outputs
+
+
+def adb_connect(interface=None, network=None, port=5555, timeout=1, concurrency=256, rescan=False):
+    if not network:
+        if not interface:
+            interface = 'wlo1'
+        ip = u.get_ip(interface)
+        if not ip:
+            logger.error('Unable to find IP address of {}'.format(interface))
+            return []
+        network = '{}/24'.format(ip)
+    network = ipaddress.ip_network(network, strict=False)
+    hosts = [str(host) for host in network.hosts()]
+
+    cache = u.get_cache()
+    known = [] if rescan else cache.get('adb_devices', str(network), [])
+    devices, outputs = asyncio.run(scan_and_connect(hosts, known, port, timeout, concurrency))
+    for output in outputs:
+        print(output)
+    if devices:
+        cache.set('adb_devices', str(network), devices)
+    else:
+        logger.info('No devices found in {}'.format(network))
+    return devices
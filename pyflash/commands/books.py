@@ -0,0 +1,92 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os.path import dirname, expanduser, join
+
+from .. import mover
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+
+def books_meta_data(files, cache, jobs=None):
+    """
+    Return meta data of given book entries keyed by path. Books missing from
+    the `ebook_meta` namespace of `cache` or changed since they were cached
+    are read in parallel by `jobs` workers and cached.
+    """
+    meta_data = {}
+    pending = {}
+    for entry in files:
+        stat = entry.stat()
+        key = (stat.st_size, stat.st_mtime)
+        cached = cache.get('ebook_meta', entry.path)
+        if cached and cached[0] == key:
+            meta_data[entry.path] = cached[1]
+        else:
+            pending[entry.path] = key
+
+    if pending:
+        logger.info('Reading meta data of {} books'.format(len(pending)))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(u.ebook_meta_data, path): path for path in pending}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                meta_data[path] = future.result()
+            except Exception as e:
+                logger.error(e)
+                continue
+            cache.set('ebook_meta', path, (pending[path], meta_data[path]))
+
+    return meta_data
+
+
+def organize_books(directory=None, jobs=None):
+    if not directory:
+        directory = os.getcwd()
+    logger.info('Organizing books in {}'.format(directory))
+
+    patterns = ['*.epub', '*.mobi', '*.pdf']
+    files = u.scan_files(directory, patterns)
+    cache = u.get_cache()
+    meta_data = books_meta_data(files, cache, jobs)
+    renames = []
+    for file_name, meta in meta_data.items():
+        title = meta.get('Title', '')
+        if not title or title == 'Unknown':
+            continue
+        title = title.replace(" ", "_").lower()
+        ext = file_name.split('.')[-1]
+        dir_name = dirname(file_name)
+        new_file_name = join(dir_name, '{}.{}'.format(title, ext))
+        if new_file_name == file_name:
+            continue
+        renames.append((file_name, new_file_name))
+
+    for file_name, new_file_name in mover.move_files(renames, jobs):
+        cached = cache.get('ebook_meta', file_name)
+        if cached:
+            cache.delete('ebook_meta', file_name)
+            cache.set('ebook_meta', new_file_name, cached)
+        logger.info('Rearranged {} -> {}'.format(file_name, new_file_name))
+
+
+def send_to_kindle(source, destination, jobs=None):
+    logger.info('Search for books in {}'.format(source))
+    source = expanduser(source)
+    destination = expanduser(destination)
+    patterns = ['*.epub', '*.azw3', '*.mobi', '*.pdf']
+    files = list(u.matched_files(patterns, source))
+    epubs = [f for f in files if f.endswith('.epub')]
+    files = [f for f in files if not f.endswith('.epub')]
+    files += u.convert_books(source, '.epub', '.mobi', files=epubs, jobs=jobs)
+    files = list(dict.fromkeys(files))
+    for filename in files:
+        logger.info('Syncing {}'.format(filename))
+    mover.move_files([(filename, join(destination, '')) for filename in files], jobs)
+
+
+def download_book():
+    pass
@@ -0,0 +1,301 @@
+import functools
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import importmagic
+from importmagic.index import BUILTIN_MODULES, JSONEncoder as IndexEncoder
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _pep8_options(directory):
+    import autopep8
+
+    # autopep8 looks for setup.cfg, tox.ini etc. from the file's directory up
+    return autopep8.parse_args([os.path.join(directory, '_.py')], apply_config=True)
+
+
+def pep8_options(file_name):
+    """
+    autopep8 options of a file, from the same config files the autopep8
+    command honours.
+    """
+    return _pep8_options(os.path.dirname(os.path.abspath(file_name)))
+
+
+def pep8_options_key(options):
+    values = sorted(
+        (name, sorted(value) if isinstance(value, (set, dict)) else value)
+        for name, value in vars(options).items() if name != 'files'
+    )
+    return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()[:12]
+
+
+def pep8_file(file_name, options=None):
+    """
+    Fix PEP8 issues of a file in place. Returns the hash of the fixed
+    content, whether the file changed and the time it took.
+    """
+    import autopep8
+
+    started = time.perf_counter()
+    # bytes in and out, so CRLF files stay CRLF and hash like pyformat does
+    with open(file_name, 'rb') as fh:
+        content = fh.read()
+    source = content.decode('utf-8')
+    fixed = autopep8.fix_code(source, options or pep8_options(file_name))
+    if fixed != source:
+        content = fixed.encode('utf-8')
+        with open(file_name, 'wb') as fh:
+            fh.write(content)
+    digest = hashlib.sha1(content).hexdigest()
+    return digest, fixed != source, time.perf_counter() - started
+
+
+def pyformat(project_root, jobs=None, slowest=5, since=None):
+    """
+    Fix PEP8 issues of python files in a process pool. Files whose content
+    is known to be clean with the same autopep8 version and options are
+    skipped.
+    """
+    import autopep8
+
+    cache = u.get_cache()
+    files, options, prefixes = [], [], []
+    for file_name in python_files(project_root, since):
+        file_options = pep8_options(file_name)
+        prefix = '{}:{}'.format(autopep8.__version__, pep8_options_key(file_options))
+        with open(file_name, 'rb') as fh:
+            digest = hashlib.sha1(fh.read()).hexdigest()
+        if not cache.get('pep8', '{}:{}'.format(prefix, digest)):
+            files.append(file_name)
+            options.append(file_options)
+            prefixes.append(prefix)
+    logger.info('Checking {} files for PEP8 issues'.format(len(files)))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(pep8_file, files, options, chunksize=8))
+
+    changed = []
+    for file_name, prefix, (digest, fixed, elapsed) in zip(files, prefixes, results):
+        cache.set('pep8', '{}:{}'.format(prefix, digest), True)
+        if fixed:
+            changed.append(file_name)
+            logger.info('Fixed PEP8 issues in {}'.format(file_name))
+
+    timings = sorted(zip((r[2] for r in results), files), reverse=True)
+    for elapsed, file_name in timings[:slowest]:
+        logger.info('{:.2f}s {}'.format(elapsed, file_name))
+    return changed
+
+
+def _fix_pep8(project_root, jobs=None, since=None):
+    logger.info('Fixing PEP8 issues')
+    return pyformat(project_root, jobs, since=since)
+
+
+def fix_imports_in_code(index, source):
+    scope = importmagic.Scope.from_source(source)
+    unresolved, unreferenced = scope.find_unresolved_and_unreferenced_symbols()
+    if not unresolved and not unreferenced:
+        return source
+    # start_line, end_line, import_block = importmagic.get_update(source, index, unresolved, unreferenced)
+    source = importmagic.update_imports(
+        source, index, unresolved, unreferenced
+    )
+    return source
+
+
+def _entry_signature(path):
+    """
+    Cheap fingerprint of a module or package, changes when any of its files
+    is added, removed or modified.
+    """
+    stat = os.stat(path)
+    items = [(path, stat.st_size, stat.st_mtime)]
+    if os.path.isdir(path):
+        for entry in u.scan_files(path, ['*.py', '*.so']):
+            stat = entry.stat()
+            items.append((entry.path, stat.st_size, stat.st_mtime))
+        items.sort()
+    return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()
+
+
+def _index_entry(path):
+    """
+    Index a single sys.path entry (or builtin modules when path is None) and
+    return its serialized symbol trees.
+    """
+    index = importmagic.SymbolIndex()
+    baseline = set(index._tree)
+    if path is None:
+        for builtin in BUILTIN_MODULES:
+            index.index_builtin(builtin, location='S')
+        names = index._tree
+    else:
+        index.index_path(path)
+        names = set(index._tree) - baseline
+    return {name: json.loads(json.dumps(index._tree[name], cls=IndexEncoder)) for name in names}
+
+
+def _cached_trees(cache, entries, trees):
+    """
+    Add cached trees of [(entry, signature)] to `trees`, returns the stale
+    entries.
+    """
+    cached = cache.get_many('symbol_index', [entry for entry, _ in entries])
+    stale = []
+    for entry, signature in entries:
+        hit = cached.get(str(entry))
+        if hit and hit[0] == signature:
+            trees[entry] = hit[1]
+        else:
+            stale.append((entry, signature))
+    return stale
+
+
+def load_symbol_index(paths, jobs=None):
+    """
+    Build a symbol index of given paths from per module/package indexes
+    cached in the pyflash cache. Only entries that changed since they were
+    cached are indexed again.
+    """
+    cache = u.get_cache()
+    entries = [(None, sys.version)]
+    for path in dict.fromkeys(os.path.abspath(p or '.') for p in paths):
+        if not os.path.isdir(path):
+            continue
+        for name in sorted(os.listdir(path)):
+            entry = os.path.join(path, name)
+            try:
+                entries.append((entry, _entry_signature(entry)))
+            except OSError:
+                continue
+
+    trees = {}
+    stale = _cached_trees(cache, entries, trees)
+    if stale:
+        # fix_imports workers load the index at the same time, the first
+        # one indexes and the others read what it cached
+        with u.file_lock(cache.path + '.symbol_index.lock'):
+            stale = _cached_trees(cache, stale, trees)
+            if stale:
+                logger.info('Indexing {} of {} modules'.format(len(stale), len(entries)))
+                with ProcessPoolExecutor(max_workers=jobs) as pool:
+                    results = pool.map(_index_entry, [entry for entry, _ in stale], chunksize=16)
+                    for (entry, signature), tree in zip(stale, results):
+                        cache.set('symbol_index', entry, (signature, tree))
+                        trees[entry] = tree
+
+    data = {}
+    for entry, _ in entries:
+        for name, tree in trees[entry].items():
+            data.setdefault(name, tree)
+    return importmagic.SymbolIndex.deserialize(io.StringIO(json.dumps(data)))
+
+
+class LazySymbolIndex:
+    """
+    Load the symbol index on first use, so files without anything to fix
+    don't wait for it.
+    """
+    def __init__(self, paths, jobs=None):
+        self.paths = paths
+        self.jobs = jobs
+        self._index = None
+
+    def __getattr__(self, name):
+        if self._index is None:
+            self._index = load_symbol_index(self.paths, self.jobs)
+        return getattr(self._index, name)
+
+
+EXCLUDE_DIRS = ('venv', 'node_modules', '__pycache__')
+
+_index = None
+
+
+def _init_worker(paths, jobs=None):
+    global _index
+    # every worker loads the index once it meets a file to fix
+    _index = LazySymbolIndex(paths, jobs)
+
+
+def fix_imports_in_file(file_name):
+    """
+    Fix imports of a file in place, returns True when it was changed.
+    """
+    with open(file_name) as fh:
+        source = fh.read()
+    fixed = fix_imports_in_code(_index, source)
+    if fixed == source:
+        return False
+    with open(file_name, 'w') as fh:
+        fh.write(fixed)
+    return True
+
+
+def git_changed_files(project_root):
+    """
+    Python files modified or added since the last git commit.
+    """
+    with u.cd(project_root):
+        out = u.run_shell_command('git diff --name-only --relative HEAD')
+        out += u.run_shell_command('git ls-files --others --exclude-standard')
+    files = (os.path.join(project_root, line) for line in out.splitlines())
+    return {os.path.abspath(f) for f in files if f.endswith('.py') and os.path.exists(f)}
+
+
+def python_files(project_root, since=None):
+    """
+    Python files of a project. `since` limits them to files changed since
+    the last run or the last git commit.
+    """
+    files = u.scan_files(project_root, ['*.py'], exclude=EXCLUDE_DIRS)
+    if since == 'git':
+        changed = git_changed_files(project_root)
+        return [entry.path for entry in files if os.path.abspath(entry.path) in changed]
+    if since == 'last-run':
+        last_run = u.get_cache().get('fix_imports', os.path.abspath(project_root), 0)
+        return [entry.path for entry in files if entry.stat().st_mtime > last_run]
+    return [entry.path for entry in files]
+
+
+def fix_imports(project_root, since=None, jobs=None):
+    if not project_root:
+        project_root = os.getcwd()
+    started = time.time()
+    paths = sys.path + [project_root]
+    files = python_files(project_root, since)
+    logger.info('Fixing imports in {} files'.format(len(files)))
+
+    jobs = jobs or os.cpu_count()
+    if jobs == 1 or len(files) < 2:
+        _init_worker(paths, jobs)
+        results = list(map(fix_imports_in_file, files))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(paths, jobs)) as pool:
+            results = list(pool.map(fix_imports_in_file, files, chunksize=8))
+
+    changed = [file_name for file_name, fixed in zip(files, results) if fixed]
+    for file_name in changed:
+        logger.info('Fixed imports in {}'.format(file_name))
+    u.get_cache().set('fix_imports', os.path.abspath(project_root), started)
+    return changed
+
+
+def fix_build(directory, since=None, jobs=None):
+    if not directory:
+        directory = os.getcwd()
+    _fix_pep8(directory, jobs, since)
+    fix_imports(directory, since, jobs)
@@ -0,0 +1,162 @@
+"""
+Find duplicate files.
+
+Files are bucketed by size, then by a hash of their first and last blocks
+and only the remaining candidates are hashed fully. Hashes are cached by
+inode, size and mtime, so re-runs only read new or changed files. They
+are read and written in batches in their own cache namespace, which has
+room for large libraries.
+"""
+import collections
+import hashlib
+import logging
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+SAVE_EVERY = 1000
+
+
+def partial_hash(path, size):
+    """
+    Hash of the first and last BLOCK_SIZE bytes of a file.
+    """
+    h = hashlib.blake2b()
+    with open(path, 'rb') as fh:
+        h.update(fh.read(BLOCK_SIZE))
+        if size > BLOCK_SIZE:
+            fh.seek(max(BLOCK_SIZE, size - BLOCK_SIZE))
+            h.update(fh.read(BLOCK_SIZE))
+    return h.hexdigest()
+
+
+def full_hash(path, size):
+    h = hashlib.blake2b()
+    if not size:
+        return h.hexdigest()
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        # hashlib releases the GIL while hashing large buffers
+        h.update(m)
+    return h.hexdigest()
+
+
+def file_key(kind, stat):
+    """
+    Cache key of data derived from a file, changes when the file does.
+    """
+    return '{}:{}:{}:{}:{}'.format(kind, stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _hash(func, path, size):
+    try:
+        return func(path, size)
+    except OSError as e:
+        logger.error(e)
+
+
+def group_by(files, kind, func, cache, pool):
+    """
+    Group {path: stat} by size and func(path, size), dropping groups of one.
+    """
+    groups = collections.defaultdict(list)
+    keys = {path: file_key(kind, stat) for path, stat in files.items()}
+    cached = cache.get_many('file_hash', keys.values())
+    pending = []
+    for path, stat in files.items():
+        digest = cached.get(keys[path])
+        if digest is None:
+            pending.append(path)
+        else:
+            groups[stat.st_size, digest].append(path)
+
+    results = pool.map(lambda path: _hash(func, path, files[path].st_size), pending)
+    hashed = []
+    for path, digest in zip(pending, results):
+        if digest is None:
+            continue
+        hashed.append((keys[path], digest))
+        groups[files[path].st_size, digest].append(path)
+        # save progress in batches, an interrupted run keeps most hashes
+        if len(hashed) >= SAVE_EVERY:
+            cache.set_many('file_hash', hashed)
+            hashed = []
+    cache.set_many('file_hash', hashed)
+    return [(size, sorted(paths)) for (size, _), paths in groups.items() if len(paths) > 1]
+
+
+def find_duplicates(directories, min_size=1, jobs=None):
+    """
+    Return groups of identical files as (size, [paths]), the ones wasting
+    the most space first.
+    """
+    by_size = collections.defaultdict(dict)
+    inodes = set()
+    for directory in directories:
+        for entry in u.scan_files(directory):
+            if entry.is_symlink():
+                continue
+            stat = entry.stat()
+            # hardlinks to a file already seen take no extra space
+            if stat.st_size < min_size or (stat.st_dev, stat.st_ino) in inodes:
+                continue
+            inodes.add((stat.st_dev, stat.st_ino))
+            by_size[stat.st_size][entry.path] = stat
+
+    files = {path: stat for same in by_size.values() if len(same) > 1 for path, stat in same.items()}
+    logger.info('Found {} files with a duplicate size'.format(len(files)))
+
+    cache = u.get_cache()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        duplicates = []
+        candidates = {}
+        for size, paths in group_by(files, 'partial', partial_hash, cache, pool):
+            if size <= 2 * BLOCK_SIZE:
+                # head and tail already cover the whole file
+                duplicates.append((size, paths))
+            else:
+                candidates.update((path, files[path]) for path in paths)
+        logger.info('Hashing {} candidates'.format(len(candidates)))
+        duplicates += group_by(candidates, 'full', full_hash, cache, pool)
+    return sorted(duplicates, key=lambda d: (d[0] * (len(d[1]) - 1), d[1]), reverse=True)
+
+
+def remove_duplicate(original, duplicate, action):
+    if action == 'delete':
+        os.remove(duplicate)
+        return
+    tmp = duplicate + '.pyflash-link'
+    os.link(original, tmp)
+    os.replace(tmp, duplicate)
+
+
+def find_duplicates_command(directories, min_size=1, action=None, jobs=None):
+    if not directories:
+        directories = [os.getcwd()]
+    duplicates = find_duplicates(directories, min_size, jobs)
+
+    reclaimable = 0
+    count = 0
+    for size, paths in duplicates:
+        original, rest = paths[0], paths[1:]
+        print('{:.1f} MB x {}'.format(size / 1024 / 1024, len(paths)))
+        print('  {}'.format(original))
+        for path in rest:
+            print('  {}'.format(path))
+            if action:
+                try:
+                    remove_duplicate(original, path, action)
+                except OSError as e:
+                    logger.error('Unable to {} {}: {}'.format(action, path, e))
+                    continue
+            reclaimable += size
+            count += 1
+
+    verb = 'Reclaimed' if action else 'Reclaimable'
+    print('{} duplicate files. {}: {:.1f} MB'.format(count, verb, reclaimable / 1024 / 1024))
+    return duplicates
@@ -0,0 +1,344 @@
+"""
+Import graph of a python project.
+
+Imports of each file are cached by content hash, so re-running on a large
+project only parses the files that changed.
+"""
+import ast
+import collections
+import functools
+import hashlib
+import json
+import logging
+import os
+import pkgutil
+import sys
+import sysconfig
+from concurrent.futures import ProcessPoolExecutor
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+EXCLUDE_DIRS = ('venv', 'node_modules', '__pycache__', 'build', 'dist')
+
+
+@functools.lru_cache()
+def stdlib_modules():
+    """
+    Names of top level standard library modules.
+    """
+    names = getattr(sys, 'stdlib_module_names', None)
+    if names is not None:
+        return frozenset(names)
+    # before python 3.10, list the modules of the stdlib directories
+    paths = sysconfig.get_paths()
+    directories = [paths['stdlib'], os.path.join(paths['platstdlib'], 'lib-dynload')]
+    names = {name for _, name, _ in pkgutil.iter_modules(directories)}
+    return frozenset(names.union(sys.builtin_module_names))
+
+
+def import_nodes(tree):
+    """
+    Yield (node, lazy) for import statements, lazy ones are inside functions.
+    """
+    stack = [(tree, False)]
+    while stack:
+        node, lazy = stack.pop()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node, lazy
+        lazy = lazy or isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda))
+        # reversed, so imports come out in source order
+        stack.extend(reversed([(child, lazy) for child in ast.iter_child_nodes(node)]))
+
+
+def resolve_name(module, level, package):
+    if not level:
+        return module
+    parts = package.split('.') if package else []
+    if level - 1 > len(parts):
+        return '.' * level + (module or '')
+    base = '.'.join(parts[:len(parts) - (level - 1)])
+    return '.'.join(filter(None, [base, module]))
+
+
+def get_imports(tree, package=None, lazy=True):
+    imports = []
+    for node, is_lazy in import_nodes(tree):
+        if is_lazy and not lazy:
+            continue
+        if isinstance(node, ast.Import):
+            for name in node.names:
+                imports.append(name.name)
+        if isinstance(node, ast.ImportFrom):
+            module = node.module
+            if package is not None:
+                module = resolve_name(node.module, node.level, package)
+            for name in node.names:
+                imports.append('{}.{}'.format(module, name.name))
+
+    return imports
+
+
+def package_name(root):
+    """
+    Dotted name of `root` when it is a package itself, '' otherwise.
+    """
+    parts = []
+    path = os.path.abspath(root)
+    while os.path.exists(os.path.join(path, '__init__.py')):
+        path, name = os.path.split(path)
+        parts.append(name)
+    return '.'.join(reversed(parts))
+
+
+def module_name(root, path, package=''):
+    name = os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, '.')
+    if name == '__init__':
+        name = ''
+    elif name.endswith('.__init__'):
+        name = name[:-len('.__init__')]
+    return '.'.join(filter(None, [package, name]))
+
+
+def parse_imports(path, module, is_package):
+    """
+    Return (eager, lazy) imports of a file.
+    """
+    with open(path, 'rb') as fh:
+        source = fh.read()
+    try:
+        tree = ast.parse(source, path)
+    except (SyntaxError, ValueError) as e:
+        logger.error('Unable to parse {}: {}'.format(path, e))
+        return [], []
+    package = module if is_package else module.rpartition('.')[0]
+    eager = get_imports(tree, package, lazy=False)
+    every = get_imports(tree, package)
+    lazy = list((collections.Counter(every) - collections.Counter(eager)).elements())
+    return eager, lazy
+
+
+def project_imports(root, jobs=None):
+    """
+    Return {module: (path, eager imports, lazy imports)} of a project.
+    """
+    cache = u.get_cache()
+    # relative imports of a scanned package resolve against its real name
+    package = package_name(root)
+    modules = {}
+    pending = []
+    for entry in u.scan_files(root, ['*.py'], exclude=EXCLUDE_DIRS):
+        module = module_name(root, entry.path, package)
+        is_package = entry.name == '__init__.py'
+        with open(entry.path, 'rb') as fh:
+            digest = hashlib.sha1(fh.read()).hexdigest()
+        key = '{}:{}:{}'.format(digest, module, is_package)
+        cached = cache.get('import_graph', key)
+        if cached is not None:
+            modules[module] = (entry.path,) + tuple(cached)
+        else:
+            pending.append((key, entry.path, module, is_package))
+
+    if pending:
+        logger.info('Parsing {} files'.format(len(pending)))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(
+                parse_imports,
+                [p[1] for p in pending], [p[2] for p in pending], [p[3] for p in pending],
+                chunksize=32,
+            )
+            for (key, path, module, _), imports in zip(pending, results):
+                cache.set('import_graph', key, imports)
+                modules[module] = (path,) + tuple(imports)
+    return modules
+
+
+class ImportGraph:
+    def __init__(self, modules):
+        self.modules = modules
+        self.edges = {}
+        self.lazy_edges = {}
+        self.external = {}
+        for module, (path, eager, lazy) in modules.items():
+            self.edges[module], ext = self._resolve(eager)
+            self.lazy_edges[module], lazy_ext = self._resolve(lazy)
+            self.external[module] = (ext, lazy_ext)
+
+    def _target(self, name):
+        """
+        Longest project module that is a prefix of an imported name.
+        """
+        parts = name.split('.')
+        for i in range(len(parts), 0, -1):
+            candidate = '.'.join(parts[:i])
+            if candidate in self.modules:
+                return candidate
+
+    def _resolve(self, names):
+        targets = set()
+        external = set()
+        for name in names:
+            target = self._target(name)
+            if target is not None:
+                targets.add(target)
+            elif not name.startswith('.') and name.split('.')[0] not in stdlib_modules():
+                external.add(name.split('.')[0])
+        return targets, external
+
+    def cycles(self):
+        """
+        Import cycles in import order, covering every module of each
+        strongly connected component.
+        """
+        cycles = []
+        for component in self.components():
+            members = set(component)
+            covered = set()
+            for module in component:
+                if module not in covered:
+                    cycle = self._shortest_cycle(module, members)
+                    covered.update(cycle)
+                    cycles.append(cycle)
+        return cycles
+
+    def _shortest_cycle(self, start, members):
+        """
+        Shortest path from `start` back to itself through `members` (BFS).
+        """
+        parents = {}
+        queue = collections.deque([start])
+        while queue:
+            node = queue.popleft()
+            for child in sorted(self.edges[node] & members):
+                if child == start:
+                    cycle = [node]
+                    while cycle[-1] != start:
+                        cycle.append(parents[cycle[-1]])
+                    return cycle[::-1]
+                if child not in parents:
+                    parents[child] = node
+                    queue.append(child)
+        return [start]
+
+    def components(self):
+        """
+        Strongly connected components with more than one module (Tarjan).
+        """
+        index = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        result = []
+        counter = 0
+        for start in self.edges:
+            if start in index:
+                continue
+            work = [(start, iter(sorted(self.edges[start])))]
+            index[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.edges[child]))))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self.edges[node]:
+                            result.append(sorted(component))
+        return sorted(result, key=len, reverse=True)
+
+    def fan_in(self):
+        counts = collections.Counter()
+        for targets in self.edges.values():
+            counts.update(targets)
+        return counts
+
+    def fan_out(self):
+        return collections.Counter({module: len(targets) for module, targets in self.edges.items()})
+
+    def closure(self, module, lazy=False):
+        """
+        Project modules and external packages imported when `module` is
+        imported. Importing a.b.c also runs a and a.b.
+        """
+        seen = set()
+        external = set()
+        queue = [module]
+        while queue:
+            node = queue.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            parts = node.split('.')
+            queue.extend(p for p in ('.'.join(parts[:i]) for i in range(1, len(parts))) if p in self.modules)
+            queue.extend(self.edges[node])
+            external.update(self.external[node][0])
+            if lazy:
+                queue.extend(self.lazy_edges[node])
+                external.update(self.external[node][1])
+        return sorted(seen), sorted(external)
+
+
+def import_graph(root, entry_points=(), top=10, lazy=False, as_json=False, jobs=None):
+    if not root:
+        root = os.getcwd()
+    graph = ImportGraph(project_imports(root, jobs))
+    if not entry_points:
+        entry_points = [m for m in graph.modules if m == '__main__' or m.endswith('.__main__')]
+
+    report = {
+        'modules': len(graph.modules),
+        'cycles': graph.cycles(),
+        'fan_in': graph.fan_in().most_common(top),
+        'fan_out': graph.fan_out().most_common(top),
+        'entry_points': {},
+    }
+    for entry in entry_points:
+        if entry not in graph.modules:
+            logger.error('Unknown module {}'.format(entry))
+            continue
+        modules, external = graph.closure(entry, lazy)
+        report['entry_points'][entry] = {'modules': modules, 'external': external}
+
+    if as_json:
+        print(json.dumps(report, indent=4))
+        return report
+
+    print('Modules: {}'.format(report['modules']))
+    print('\nImport cycles: {}'.format(len(report['cycles'])))
+    for cycle in report['cycles']:
+        print('  ' + ' -> '.join(cycle + cycle[:1]))
+    print('\nMost imported (fan-in):')
+    for module, count in report['fan_in']:
+        print('  {:5} {}'.format(count, module))
+    print('\nMost importing (fan-out):')
+    for module, count in report['fan_out']:
+        print('  {:5} {}'.format(count, module))
+    for entry, closure in report['entry_points'].items():
+        print('\n{} imports {} project modules and {} external packages:'.format(
+            entry, len(closure['modules']), len(closure['external']),
+        ))
+        print('  ' + ', '.join(closure['external']))
+    return report
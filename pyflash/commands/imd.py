@@ -0,0 +1,131 @@
+import datetime as dt
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os.path import join
+from urllib.parse import unquote
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+IMD_HOST = 'http://imdaws.com/'
+ENDPOINT = 'userdetails.aspx?Dtype=AWS&State={}&Dist=0&Loc=0&FromDate={}&ToDate={}&Time='
+STATES = range(1, 29)
+# the report page of a large chunk takes a while to generate
+TIMEOUT = (10, 120)
+
+
+def parse_date(value):
+    value = unquote(value)
+    for fmt in ('%d/%m/%Y', '%Y-%m-%d'):
+        try:
+            return dt.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError('Invalid date {}, use DD/MM/YYYY'.format(value))
+
+
+def date_chunks(from_date, to_date, days):
+    """
+    Split the inclusive range from_date..to_date into ranges of `days`.
+    """
+    start = from_date
+    while start <= to_date:
+        end = min(start + dt.timedelta(days=days - 1), to_date)
+        yield start, end
+        start = end + dt.timedelta(days=1)
+
+
+def download_chunk(session, host, credentials, state, from_date, to_date, data_dir, retries=3):
+    """
+    Download AWS data of a state for the given dates into data_dir. Data is
+    streamed into a .part file which is renamed once complete, so existing
+    csv files are always complete.
+    """
+    name = '{}_{:%Y%m%d}_{:%Y%m%d}.csv'.format(state, from_date, to_date)
+    file_name = join(data_dir, name)
+    if os.path.exists(file_name):
+        logger.info('Skipping {}, already downloaded'.format(file_name))
+        return file_name
+
+    url = host + ENDPOINT.format(state, from_date.strftime('%d%%2f%m%%2f%Y'), to_date.strftime('%d%%2f%m%%2f%Y'))
+    for attempt in range(1, retries + 1):
+        try:
+            resp = session.post(url, data=credentials, timeout=TIMEOUT)
+            resp.raise_for_status()
+            page = resp.content.decode('utf-8')
+            d_url = page.split("DownloadData('")[1].split("'")[0]
+
+            part_file = file_name + '.part'
+            with session.get(d_url, stream=True, timeout=TIMEOUT) as r:
+                r.raise_for_status()
+                with open(part_file, 'wb') as fh:
+                    for chunk in r.iter_content(chunk_size=64 * 1024):
+                        fh.write(chunk)
+            os.replace(part_file, file_name)
+            logger.info('Downloaded {}'.format(file_name))
+            return file_name
+        except Exception as e:
+            if attempt == retries:
+                raise
+            logger.warning('Retrying {} ({}/{}): {}'.format(name, attempt, retries, e))
+            time.sleep(2 ** attempt)
+
+
+def download_imd_data(from_date, to_date, state, jobs=None, chunk_days=31, data_dir='data', host=IMD_HOST):
+    if from_date:
+        from_date = parse_date(from_date)
+    else:
+        from_date = dt.date.today()
+    if to_date:
+        to_date = parse_date(to_date)
+    else:
+        to_date = from_date + dt.timedelta(days=31)
+
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+
+    username = os.environ.get('IMD_USERNAME')
+    password = os.environ.get('IMD_PASSWORD')
+    if not (username and password):
+        logger.error('Please set IMD_USERNAME, IMD_PASSWORD env variables.')
+        sys.exit()
+
+    credentials = {
+        'txtUserName': username,
+        'txtPassword': password,
+        'btnSave': 'Download',
+    }
+    states = [int(state)] if state else STATES
+    chunks = list(date_chunks(from_date, to_date, chunk_days))
+
+    legacy = [join(data_dir, '{}.csv'.format(s)) for s in states if os.path.exists(join(data_dir, '{}.csv'.format(s)))]
+    if legacy:
+        # old files don't say which dates they hold, so they can't be reused
+        logger.warning('Ignoring {} files named <state>.csv from older versions, data is now saved as '
+                       '<state>_<from>_<to>.csv'.format(len(legacy)))
+
+    jobs = jobs or 4
+    # download_chunk retries the login and the download as a whole, so the
+    # session doesn't retry on its own
+    session = u.http_session(pool_size=jobs, retries=0)
+    failed = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(download_chunk, session, host, credentials, s, start, end, data_dir): (s, start, end)
+            for s in states
+            for start, end in chunks
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed.append((futures[future], e))
+
+    for (s, start, end), error in failed:
+        logger.error('Failed to download state {} from {} to {}: {}'.format(s, start, end, error))
+    return failed
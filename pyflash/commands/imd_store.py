@@ -0,0 +1,305 @@
+"""
+Columnar store for IMD AWS data downloaded by download_imd_data.
+
+Each station gets a directory holding a sorted int64 index of timestamps
+(`index.npy`) and one float32 array per variable, which are memory mapped
+for queries. Ingested csv files are remembered by size and mtime, so only
+new downloads are parsed again.
+"""
+import csv
+import datetime as dt
+import glob
+import json
+import logging
+import os
+import re
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+TIME_FORMATS = ('%H:%M:%S', '%H:%M')
+AGGREGATES = ('mean', 'max', 'min', 'sum', 'count')
+
+
+def _find_column(header, name, taken=()):
+    for index, column in enumerate(header):
+        if index not in taken and name in column.lower():
+            return index
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _parse_timestamps(dates, times):
+    if times is not None:
+        values = ['{}T{}'.format(d.strip(), t.strip()) for d, t in zip(dates, times)]
+    else:
+        values = [d.strip() for d in dates]
+    try:
+        return np.array(values, dtype='datetime64[s]').astype(np.int64)
+    except ValueError:
+        pass
+
+    timestamps = np.empty(len(dates), dtype=np.int64)
+    for i, date in enumerate(dates):
+        day = _parse(date.strip(), DATE_FORMATS).date()
+        seconds = 0
+        if times is not None:
+            t = _parse(times[i].strip(), TIME_FORMATS)
+            seconds = t.hour * 3600 + t.minute * 60 + t.second
+        timestamps[i] = (day - dt.date(1970, 1, 1)).days * 86400 + seconds
+    return timestamps
+
+
+def _parse(value, formats):
+    for fmt in formats:
+        try:
+            return dt.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError('Unable to parse {}'.format(value))
+
+
+def read_csv(file_name):
+    """
+    Stream an IMD csv and return {station: (timestamps, {variable: values})}.
+    """
+    with open(file_name, newline='') as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if not header:
+            return {}
+        header = [column.strip() for column in header]
+        station_col = _find_column(header, 'station')
+        date_col = _find_column(header, 'date')
+        # a single DATETIME column is the date column, not the time one too
+        time_col = _find_column(header, 'time', taken={date_col})
+        if station_col is None or date_col is None:
+            raise ValueError('{} has no station/date columns'.format(file_name))
+        skip = {station_col, date_col, time_col}
+        variables = [(i, name) for i, name in enumerate(header) if i not in skip]
+
+        rows = {}
+        for row in reader:
+            if len(row) < len(header):
+                continue
+            rows.setdefault(row[station_col].strip(), []).append(row)
+
+    data = {}
+    for station, station_rows in rows.items():
+        dates = [row[date_col] for row in station_rows]
+        times = [row[time_col] for row in station_rows] if time_col is not None else None
+        timestamps = _parse_timestamps(dates, times)
+        values = {
+            name: np.array([_to_float(row[i]) for row in station_rows], dtype=np.float32)
+            for i, name in variables
+        }
+        data[station] = (timestamps, values)
+    return data
+
+
+def _slug(station):
+    return re.sub(r'[^\w.-]+', '_', station).strip('_') or 'unknown'
+
+
+def _save(path, array):
+    tmp = path + '.tmp.npy'
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+class Station:
+    def __init__(self, store_dir, name):
+        self.name = name
+        self.path = os.path.join(store_dir, _slug(name))
+
+    @property
+    def variables(self):
+        meta_file = os.path.join(self.path, 'meta.json')
+        if not os.path.exists(meta_file):
+            return []
+        with open(meta_file) as fh:
+            return json.load(fh)['variables']
+
+    def load(self, variable=None, mmap_mode='r'):
+        index = np.load(os.path.join(self.path, 'index.npy'), mmap_mode=mmap_mode)
+        if variable is None:
+            return index
+        return index, np.load(os.path.join(self.path, '{}.npy'.format(_slug(variable))), mmap_mode=mmap_mode)
+
+    def append(self, timestamps, values):
+        """
+        Merge new rows into the station arrays, newer rows win on duplicate
+        timestamps.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        stored = self.variables
+        variables = list(stored)
+        for name in values:
+            if name not in variables:
+                variables.append(name)
+
+        if os.path.exists(os.path.join(self.path, 'index.npy')):
+            old_index = self.load(mmap_mode=None)
+        else:
+            old_index = np.empty(0, dtype=np.int64)
+        index = np.concatenate([old_index, timestamps])
+
+        # np.unique keeps the first occurrence, so look at rows newest first
+        reverse = index[::-1]
+        index, first = np.unique(reverse, return_index=True)
+        order = len(reverse) - 1 - first
+
+        columns = {}
+        for name in variables:
+            old = None
+            if name in stored:
+                old = self.load(name, mmap_mode=None)[1]
+            if old is None:
+                old = np.full(len(old_index), np.nan, dtype=np.float32)
+            new = values.get(name)
+            if new is None:
+                new = np.full(len(timestamps), np.nan, dtype=np.float32)
+            columns[name] = np.concatenate([old, new])[order]
+
+        for name, column in columns.items():
+            _save(os.path.join(self.path, '{}.npy'.format(_slug(name))), column)
+        _save(os.path.join(self.path, 'index.npy'), index)
+        with open(os.path.join(self.path, 'meta.json'), 'w') as fh:
+            json.dump({'station': self.name, 'variables': variables}, fh)
+
+
+def stations(store_dir):
+    names = []
+    for meta_file in glob.glob(os.path.join(store_dir, '*', 'meta.json')):
+        with open(meta_file) as fh:
+            names.append(json.load(fh)['station'])
+    return sorted(names)
+
+
+def _merge(batches):
+    """
+    Concatenate [(timestamps, {variable: values})] of a station, variables
+    missing from a batch are NaN.
+    """
+    names = []
+    for _, values in batches:
+        names.extend(name for name in values if name not in names)
+    timestamps = np.concatenate([batch[0] for batch in batches])
+    values = {
+        name: np.concatenate([
+            values.get(name, np.full(len(stamps), np.nan, dtype=np.float32)) for stamps, values in batches
+        ])
+        for name in names
+    }
+    return timestamps, values
+
+
+def ingest(data_dir='data', store_dir='imd_store'):
+    """
+    Append csv files in `data_dir` that changed since the last run to the
+    store and return the number of files ingested. Rows of all new files
+    are merged first, so each station is rewritten once per run.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    state_file = os.path.join(store_dir, 'ingested.json')
+    ingested = {}
+    if os.path.exists(state_file):
+        with open(state_file) as fh:
+            ingested = json.load(fh)
+
+    new = {}
+    batches = {}
+    for file_name in sorted(glob.glob(os.path.join(data_dir, '*.csv'))):
+        stat = os.stat(file_name)
+        key = [stat.st_size, stat.st_mtime]
+        name = os.path.basename(file_name)
+        if ingested.get(name) == key:
+            continue
+        logger.info('Ingesting {}'.format(file_name))
+        try:
+            data = read_csv(file_name)
+        except ValueError as e:
+            logger.error(e)
+            continue
+        for station, batch in data.items():
+            batches.setdefault(station, []).append(batch)
+        new[name] = key
+
+    for station, station_batches in batches.items():
+        Station(store_dir, station).append(*_merge(station_batches))
+    # files are marked only once stored, an interrupted run ingests them
+    # again and newer rows replace the same timestamps
+    if new:
+        ingested.update(new)
+        with open(state_file, 'w') as fh:
+            json.dump(ingested, fh)
+    return len(new)
+
+
+def aggregate(timestamps, values, agg='mean', period=86400):
+    """
+    Aggregate `values` per `period` seconds, ignoring missing values.
+    Returns (period start timestamps, aggregated values).
+    """
+    if not len(timestamps):
+        return timestamps, values
+    buckets = timestamps // period
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid, starts)
+    if agg == 'count':
+        result = counts.astype(np.float64)
+    elif agg in ('sum', 'mean'):
+        result = np.add.reduceat(np.where(valid, values, 0), starts, dtype=np.float64)
+        if agg == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = result / counts
+    elif agg == 'max':
+        result = np.fmax.reduceat(values, starts).astype(np.float64)
+    elif agg == 'min':
+        result = np.fmin.reduceat(values, starts).astype(np.float64)
+    else:
+        raise ValueError('Unknown aggregate {}'.format(agg))
+    if agg != 'count':
+        result[counts == 0] = np.nan
+    return buckets[starts] * period, result
+
+
+def query(store_dir, station, variable, from_date=None, to_date=None, agg='mean', period=86400):
+    """
+    Aggregate a station variable between the given dates (inclusive).
+    """
+    index, values = Station(store_dir, station).load(variable)
+    lo, hi = 0, len(index)
+    if from_date:
+        lo = np.searchsorted(index, _epoch(from_date), side='left')
+    if to_date:
+        hi = np.searchsorted(index, _epoch(to_date) + 86400, side='left')
+    return aggregate(np.asarray(index[lo:hi]), np.asarray(values[lo:hi]), agg, period)
+
+
+def _epoch(date):
+    return (date - dt.date(1970, 1, 1)).days * 86400
+
+
+def imd_query(store_dir, station, variable, from_date, to_date, agg):
+    from .imd import parse_date
+
+    from_date = parse_date(from_date) if from_date else None
+    to_date = parse_date(to_date) if to_date else None
+    names = [station] if station else stations(store_dir)
+    for name in names:
+        if variable not in Station(store_dir, name).variables:
+            continue
+        days, result = query(store_dir, name, variable, from_date, to_date, agg)
+        for day, value in zip(days, result):
+            date = dt.date(1970, 1, 1) + dt.timedelta(seconds=int(day))
+            print('{}\t{}\t{:.2f}'.format(name, date, value))
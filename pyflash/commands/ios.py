@@ -0,0 +1,20 @@
+import logging
+from os.path import abspath
+
+try:
+    from isign import isign
+except:
+    isign = None
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+
+def ipa_install(ipa):
+    ipa = abspath(ipa)
+    logger.info('Resigning ipa: {}'.format(ipa))
+    isign.resign(ipa, output_path=ipa)
+    cmd = 'ideviceinstaller -i {}'.format(ipa)
+    u.run_shell_command(cmd)
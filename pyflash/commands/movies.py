@@ -0,0 +1,59 @@
+import logging
+import operator
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from prettytable import PrettyTable
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+
+def movies_info(titles, jobs=None, rate=None):
+    """
+    Fetch OMDb info of unique `titles` with `jobs` concurrent requests,
+    making at most `rate` requests per second.
+    """
+    jobs = jobs or 8
+    session = u.http_session(pool_size=jobs)
+    limiter = u.RateLimiter(rate)
+    info = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(u.movie_info, title, session, limiter): title for title in set(titles)}
+        for future in as_completed(futures):
+            title = futures[future]
+            try:
+                info[title] = future.result()
+            except Exception as e:
+                logger.error('Unable to fetch {}: {}'.format(title, e))
+                info[title] = None
+    return info
+
+
+def rate_movies(directory, sort, jobs=None, rate=None):
+    if not directory:
+        directory = os.getcwd()
+    logger.info('Fecting ratings for videos in {}'.format(directory))
+    catalog = u.get_catalog()
+    catalog.update(directory, jobs)
+    titles = {title for path, title, imdb_id in catalog.files(directory) if title and not imdb_id}
+    if titles:
+        for title, data in movies_info(titles, jobs, rate).items():
+            if data:
+                catalog.set_movie(title, data)
+
+    columns = ['TITLE', 'YEAR', 'GENRE', 'IMDB', 'RT', 'MC']
+    table = PrettyTable(columns)
+    for data in catalog.movies(directory):
+        r = {rating['Source']: rating['Value'] for rating in data.get('Ratings', [])}
+        table.add_row((
+            data['Title'], data['Year'], data['Genre'], r.get('Internet Movie Database', 'N/A'),
+            r.get('Rotten Tomatoes', 'N/A'), r.get('Metacritic', 'N/A'),
+        ))
+    if not sort:
+        sort = 'TITLE'
+    sort = sort.upper()
+    sort_key = columns.index(sort.upper()) + 1
+    print(table.get_string(sort_key=operator.itemgetter(sort_key, 0), sortby=sort))
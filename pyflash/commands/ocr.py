@@ -0,0 +1,26 @@
+import os
+
+from .. import utils as u
+
+
+def ocropus(file_name, language, output_dir):
+    file_name = os.path.abspath(file_name)
+    if not output_dir:
+        output_dir = os.getcwd()
+
+    py = 'python2'
+    ocropus_root = '/home/chillaranand/projects/ocr/ocropy'
+    model = '{}/models/{}.pyrnn.gz'.format(ocropus_root, language)
+
+    cmd = '{} {}/ocropus-nlbin {} -o {} -n '.format(py, ocropus_root, file_name, output_dir)
+    u.run_shell_command(cmd)
+    cmd = '{} {}/ocropus-gpageseg {}/????.bin.png -n '.format(py, ocropus_root, output_dir)
+    u.run_shell_command(cmd)
+    cmd = '{} {}/ocropus-rpred -Q 4 -m {} {}/????.bin.png -n'.format(py, ocropus_root, model, output_dir)
+    u.run_shell_command(cmd)
+
+
+def ocr(engine, file_name, language, output_dir):
+    engines = {'ocropus': ocropus}
+    engine = engines[engine]
+    engine(file_name, language, output_dir)
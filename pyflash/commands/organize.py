@@ -0,0 +1,230 @@
+import json
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import inotify
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+PHOTO_PATTERNS = [
+    '*.jpg', '*.jpeg', '*.png', '*.heic', '*.gif', '*.tif', '*.tiff',
+    '*.cr2', '*.nef', '*.arw', '*.dng', '*.mp4', '*.mov', '*.m4v', '*.3gp',
+]
+DATE_FORMAT = '%Y-%m-%d_%H_%M_%S'
+# names given by organize_photos, with an optional -N suffix on collisions
+ORGANIZED_RE = re.compile(r'^\d{4}-\d{2}-\d{2}_\d{2}_\d{2}_\d{2}(-\d+)?\.[a-z0-9]+$')
+
+
+class ExifTool:
+    """
+    A long running `exiftool -stay_open` process that executes commands
+    sent over its stdin.
+    """
+    def __init__(self, executable='exiftool'):
+        self.process = subprocess.Popen(
+            [executable, '-stay_open', 'True', '-@', '-'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def execute(self, *args):
+        with self.lock:
+            self.count += 1
+            ready = '{{ready{}}}'.format(self.count).encode('utf-8')
+            command = '\n'.join(args + ('-execute{}'.format(self.count),)) + '\n'
+            self.process.stdin.write(command.encode('utf-8'))
+            self.process.stdin.flush()
+            output = []
+            for line in iter(self.process.stdout.readline, b''):
+                if line.rstrip() == ready:
+                    break
+                output.append(line)
+        return b''.join(output).decode('utf-8')
+
+    def create_dates(self, files):
+        """
+        Return {file: create date formatted as DATE_FORMAT}.
+        """
+        output = self.execute('-json', '-q', '-m', '-CreateDate', '-d', DATE_FORMAT, *files)
+        if not output.strip():
+            return {}
+        dates = {}
+        for item in json.loads(output):
+            date = item.get('CreateDate')
+            if date and not date.startswith('0000'):
+                dates[item['SourceFile']] = date
+        return dates
+
+    def close(self):
+        self.process.stdin.write(b'-stay_open\nFalse\n')
+        self.process.stdin.flush()
+        self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_create_dates(files, jobs=None, batch_size=500):
+    """
+    Read create dates of files in batches, with one exiftool per job.
+    """
+    jobs = jobs or os.cpu_count()
+    batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+    tools = [ExifTool() for _ in range(min(jobs, len(batches)))]
+    dates = {}
+    done = 0
+    try:
+        with ThreadPoolExecutor(max_workers=len(tools) or 1) as pool:
+            futures = [
+                pool.submit(tools[i % len(tools)].create_dates, batch)
+                for i, batch in enumerate(batches)
+            ]
+            for future, batch in zip(futures, batches):
+                dates.update(future.result())
+                done += len(batch)
+                logger.info('Read {}/{} photos'.format(done, len(files)))
+    finally:
+        for tool in tools:
+            tool.close()
+    return dates
+
+
+def plan_renames(dates):
+    """
+    Return [(source, target)] renames for {file: date}. Collisions get a
+    -1, -2, ... suffix like exiftool's %-c.
+    """
+    taken = set()
+    plan = []
+    for source in sorted(dates):
+        directory, name = os.path.split(source)
+        ext = os.path.splitext(name)[1].lower()
+        base = os.path.join(directory, dates[source])
+        target = base + ext
+        copy = 0
+        while target in taken or (target != source and os.path.exists(target)):
+            copy += 1
+            target = '{}-{}{}'.format(base, copy, ext)
+        taken.add(target)
+        if target != source:
+            plan.append((source, target))
+    return plan
+
+
+def organize_photos(directory=None, dry_run=False, jobs=None):
+    if not directory:
+        directory = os.getcwd()
+    logger.info('Organizing photos in {}'.format(directory))
+    cache = u.get_cache()
+    files = {}
+    for entry in u.scan_files(directory, PHOTO_PATTERNS, ignore_case=True):
+        if ORGANIZED_RE.match(entry.name):
+            continue
+        stat = entry.stat()
+        key = (stat.st_size, stat.st_mtime)
+        # photos without a create date are only read again when they change
+        if cache.get('undated_photos', entry.path) == key:
+            continue
+        files[entry.path] = key
+    logger.info('Found {} photos to organize'.format(len(files)))
+    if not files:
+        return []
+
+    dates = read_create_dates(list(files), jobs)
+    for path, key in files.items():
+        if path not in dates:
+            cache.set('undated_photos', path, key)
+    plan = plan_renames(dates)
+    for source, target in plan:
+        if dry_run:
+            print('{} -> {}'.format(source, target))
+            continue
+        os.rename(source, target)
+    if not dry_run:
+        logger.info('Renamed {} photos'.format(len(plan)))
+    return plan
+
+
+def watch_inotify(directory, debounce=2):
+    """
+    Relocate files once they are written or moved into `directory` and
+    haven't changed for `debounce` seconds.
+    """
+    mask = inotify.IN_CLOSE_WRITE | inotify.IN_MOVED_TO | inotify.IN_CREATE
+    with inotify.Inotify() as notifier:
+        for root, _, _ in os.walk(directory):
+            notifier.add_watch(root, mask)
+        logger.info('Watching {}'.format(directory))
+        # files that were there before the watches were added are due now
+        pending = {path: -debounce for path in u.file_list(directory)}
+        while True:
+            now = time.monotonic()
+            ready = [path for path, seen in pending.items() if now - seen >= debounce]
+            for path in ready:
+                del pending[path]
+            u.relocate_files([path for path in ready if os.path.isfile(path)])
+
+            timeout = None
+            if pending:
+                timeout = max(0, debounce - (now - min(pending.values())))
+            for parent, event, name in notifier.read(timeout):
+                if event & inotify.IN_Q_OVERFLOW:
+                    logger.warning('Missed events, scanning {}'.format(directory))
+                    pending.update((path, time.monotonic()) for path in u.file_list(directory))
+                    continue
+                path = os.path.join(parent, name)
+                if event & inotify.IN_ISDIR:
+                    try:
+                        notifier.add_watch(path, mask)
+                    except OSError as e:
+                        logger.error(e)
+                        continue
+                    # files may land in it before the watch is added
+                    pending.update((child, time.monotonic()) for child in u.file_list(path))
+                elif event & (inotify.IN_CLOSE_WRITE | inotify.IN_MOVED_TO):
+                    pending[path] = time.monotonic()
+
+
+def watch_scan(directory, interval=60):
+    """
+    Periodically scan `directory` and relocate files whose size and mtime
+    didn't change since the previous scan.
+    """
+    logger.info('Scanning {} every {}s'.format(directory, interval))
+    previous = {}
+    while True:
+        current = {}
+        ready = []
+        for entry in u.scan_files(directory, hidden=True):
+            if not u.guess_file_type(entry.path):
+                continue
+            stat = entry.stat()
+            current[entry.path] = (stat.st_size, stat.st_mtime)
+            if previous.get(entry.path) == current[entry.path]:
+                ready.append(entry.path)
+                del current[entry.path]
+        u.relocate_files(ready)
+        previous = current
+        time.sleep(interval)
+
+
+def organize_downloads(directory, watch=False, debounce=2, interval=60):
+    if not directory:
+        directory = os.getcwd()
+    if watch and inotify.available():
+        watch_inotify(directory, debounce)
+        return
+    u.relocate_files(u.file_list(directory))
+    if watch:
+        watch_scan(directory, interval)
@@ -0,0 +1,26 @@
+import configparser
+import os
+import sys
+
+import pyotp
+
+
+def otp(account=None):
+    config_file = os.path.expanduser('~/.pyflash.ini')
+    if not os.path.exists(config_file):
+        print(f'Config file not found: {config_file}')
+        sys.exit(1)
+
+    config = configparser.ConfigParser()
+    config.read(config_file)
+
+    for item in config['otp']:
+        secret = config['otp'][item]
+        try:
+            otp = pyotp.TOTP(secret).now()
+            if account == item:
+                return otp
+        except:
+            continue
+        row = '{}: {}'.format(item, otp)
+        print(row)
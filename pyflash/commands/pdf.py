@@ -0,0 +1,130 @@
+import copy
+import logging
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+from PyPDF2.generic import RectangleObject
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+
+def split_page(p):
+    """
+    Return left/right (or top/bottom) halves of a two-up page.
+    """
+    q = copy.copy(p)
+
+    x1, x2 = p.mediabox.lower_left
+    x3, x4 = p.mediabox.upper_right
+
+    x1, x2 = math.floor(x1), math.floor(x2)
+    x3, x4 = math.floor(x3), math.floor(x4)
+    x5, x6 = math.floor(x3/2), math.floor(x4/2)
+
+    if x3 > x4:
+        # horizontal
+        p.mediabox = RectangleObject((x1, x2, x5, x4))
+        q.mediabox = RectangleObject((x5, x2, x3, x4))
+    else:
+        # vertical
+        p.mediabox = RectangleObject((x1, x6, x3, x4))
+        q.mediabox = RectangleObject((x1, x2, x3, x6))
+    return p, q
+
+
+def split_range(src, part_file, start, end):
+    """
+    Split pages start..end of src into part_file.
+    """
+    in_file = PyPDF2.PdfReader(src)
+    out_file = PyPDF2.PdfWriter()
+    for i in range(start, end):
+        for page in split_page(in_file.pages[i]):
+            out_file.add_page(page)
+    with open(part_file, 'wb') as fh:
+        out_file.write(fh)
+    return end - start
+
+
+def peak_memory():
+    """
+    Peak resident memory of this process and its children in MB.
+    """
+    usage = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return usage / 1024 / 1024
+    return usage / 1024
+
+
+def split_pdf(src, dst=None, jobs=1, chunk_size=100):
+    """
+    Split pages of src in ranges of `chunk_size` pages, written to temporary
+    parts by `jobs` processes and merged into dst.
+    """
+    if not src:
+        print('Enter file to convert')
+        sys.exit(0)
+    if not dst:
+        dst = src
+
+    pages = len(PyPDF2.PdfReader(src).pages)
+    ranges = [(start, min(start + chunk_size, pages)) for start in range(0, pages, chunk_size)]
+
+    dst_dir = os.path.dirname(os.path.abspath(dst))
+    with tempfile.TemporaryDirectory(dir=dst_dir) as tmp_dir:
+        parts = [os.path.join(tmp_dir, '{:06d}.pdf'.format(i)) for i in range(len(ranges))]
+        args = ([src] * len(ranges), parts, [r[0] for r in ranges], [r[1] for r in ranges])
+        if jobs == 1 or len(ranges) == 1:
+            list(map(split_range, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                list(pool.map(split_range, *args))
+
+        merger = PyPDF2.PdfMerger()
+        for part in parts:
+            merger.append(part)
+        out_file = os.path.join(tmp_dir, 'out.pdf')
+        with open(out_file, 'wb') as fh:
+            merger.write(fh)
+        merger.close()
+        os.replace(out_file, dst)
+    return pages
+
+
+def split_pdfs(directory, destination=None, jobs=None):
+    """
+    Split every pdf in a directory, one file per process.
+    """
+    files = list(u.matched_files(['*.pdf'], directory))
+    if destination:
+        os.makedirs(destination, exist_ok=True)
+        dsts = [os.path.join(destination, os.path.basename(f)) for f in files]
+    else:
+        dsts = files
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return sum(pool.map(split_pdf, files, dsts))
+
+
+def split(source, destination=None, jobs=None, chunk_size=100):
+    start = time.monotonic()
+    if source and os.path.isdir(source):
+        pages = split_pdfs(source, destination, jobs)
+    else:
+        pages = split_pdf(source, destination, jobs or os.cpu_count(), chunk_size)
+    elapsed = time.monotonic() - start
+    logger.info('Split {} pages in {:.1f}s ({:.0f} pages/s), peak memory {:.0f} MB'.format(
+        pages, elapsed, pages / elapsed if elapsed else 0, peak_memory(),
+    ))
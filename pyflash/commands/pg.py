@@ -0,0 +1,9 @@
+from .. import utils
+
+
+def pg_stats(uri, column, duration):
+    print(uri, column, duration)
+    pg_stats = utils.PGStats(uri=uri)
+    report = pg_stats.db_stats(column=column, duration=duration, include_emtpy=False)
+    for k, v in report.items():
+        print(k, v)
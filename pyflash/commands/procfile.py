@@ -0,0 +1,15 @@
+import multiprocessing
+
+from .. import utils as u
+
+
+def procfile(file):
+    data = open(file).readlines()
+    commands = [i.split(':', 1)[-1].strip() for i in data]
+    try:
+        with multiprocessing.Pool(len(commands)) as pool:
+            pool.map(u.execute_shell_command, commands)
+    except KeyboardInterrupt:
+        pool.close()
+        pool.terminate()
+        u.run_shell_command('pkill -f celery')
@@ -0,0 +1,192 @@
+"""
+Profile import time of a module or a pyflash command with -X importtime.
+"""
+import ast
+import importlib.util
+import inspect
+import json
+import logging
+import subprocess
+import sys
+import textwrap
+
+from . import graph
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_importtime(output):
+    """
+    Parse -X importtime output into a list of root nodes. Each node is a
+    dict of name, self and cumulative time in microseconds and children.
+    """
+    # imports are printed after their children, indented by nesting depth
+    pending = {0: []}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        node = {
+            'name': name.strip(),
+            'self': int(self_us),
+            'cumulative': int(cumulative),
+            'children': pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def flatten(nodes, parent=None):
+    """
+    Return {module: {self, cumulative, parent}}.
+    """
+    modules = {}
+    for node in nodes:
+        modules[node['name']] = {'self': node['self'], 'cumulative': node['cumulative'], 'parent': parent}
+        modules.update(flatten(node['children'], node['name']))
+    return modules
+
+
+def command_modules(command):
+    """
+    Modules a pyflash command imports when it runs.
+    """
+    from .. import cli
+
+    cmd = cli.cli.commands.get(command) or cli.cli.commands.get(command.replace('_', '-'))
+    if cmd is None:
+        return None
+    tree = ast.parse(textwrap.dedent(inspect.getsource(cmd.callback)))
+    modules = ['pyflash.cli']
+    for name in graph.get_imports(tree, 'pyflash'):
+        # from .commands import books imports a module, from .x import func doesn't
+        if importlib.util.find_spec(name) is None:
+            name = name.rpartition('.')[0]
+        modules.append(name)
+    return modules
+
+
+def import_profile(modules, repeat=1):
+    """
+    Import modules in fresh interpreters and return the fastest run per
+    module as {module: {self, cumulative, parent}}.
+    """
+    code = 'import {}'.format(', '.join(modules))
+    best = {}
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        stderr = proc.stderr.decode('utf-8')
+        if proc.returncode:
+            raise RuntimeError(stderr.strip().splitlines()[-1])
+        for name, timing in flatten(parse_importtime(stderr)).items():
+            if name not in best or timing['cumulative'] < best[name]['cumulative']:
+                best[name] = timing
+    return best
+
+
+def _module_file(name):
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec and spec.origin and spec.origin.endswith('.py'):
+        return spec.origin
+
+
+def deferrable(importer, module):
+    """
+    True when `importer` imports `module` at module level but only uses it
+    inside functions, so the import can move into those functions.
+    """
+    path = _module_file(importer)
+    if not path:
+        return False
+    with open(path, 'rb') as fh:
+        tree = ast.parse(fh.read(), path)
+
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name == module or alias.name.startswith(module + '.'):
+                    names.add(alias.asname or alias.name.split('.')[0])
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            if node.module == module or node.module.startswith(module + '.'):
+                names.update(alias.asname or alias.name for alias in node.names)
+    if not names:
+        return False
+
+    stack = [node for node in tree.body if not isinstance(node, (ast.Import, ast.ImportFrom))]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            # defaults and decorators run at import time
+            stack.extend(d for d in node.args.defaults + node.args.kw_defaults if d is not None)
+            stack.extend(getattr(node, 'decorator_list', []))
+            continue
+        if isinstance(node, ast.Name) and node.id in names:
+            return False
+        stack.extend(child for child in ast.iter_child_nodes(node) if child is not None)
+    return True
+
+
+def report(profile, packages, top=15, threshold=5000):
+    """
+    Print the slowest imports and the ones modules of `packages` could
+    defer.
+    """
+    total = sum(t['cumulative'] for t in profile.values() if t['parent'] is None)
+    print('Total import time: {:.1f}ms'.format(total / 1000))
+
+    print('\nSlowest imports (self time):')
+    print('  {:>10} {:>10}  {}'.format('self ms', 'cumul ms', 'module'))
+    offenders = sorted(profile.items(), key=lambda item: item[1]['self'], reverse=True)[:top]
+    for name, timing in offenders:
+        print('  {:>10.1f} {:>10.1f}  {}'.format(timing['self'] / 1000, timing['cumulative'] / 1000, name))
+
+    candidates = []
+    for name, timing in profile.items():
+        parent = timing['parent']
+        if not parent or parent.split('.')[0] not in packages:
+            continue
+        if timing['cumulative'] >= threshold and deferrable(parent, name):
+            candidates.append((timing['cumulative'], name, parent))
+    if candidates:
+        print('\nCould be deferred into the functions that use them:')
+        for cumulative, name, parent in sorted(candidates, reverse=True):
+            print('  {:>10.1f}  {} (imported by {})'.format(cumulative / 1000, name, parent))
+
+
+def compare(profile, baseline, top=15):
+    """
+    Print modules whose cumulative import time changed the most.
+    """
+    names = set(profile) | set(baseline)
+    deltas = []
+    for name in names:
+        new = profile.get(name, {}).get('cumulative', 0)
+        old = baseline.get(name, {}).get('cumulative', 0)
+        deltas.append((new - old, name, old, new))
+    deltas.sort(key=lambda d: abs(d[0]), reverse=True)
+    print('\n  {:>10} {:>10} {:>10}  {}'.format('old ms', 'new ms', 'delta ms', 'module'))
+    for delta, name, old, new in deltas[:top]:
+        print('  {:>10.1f} {:>10.1f} {:>+10.1f}  {}'.format(old / 1000, new / 1000, delta / 1000, name))
+
+
+def import_profile_command(target, repeat=1, top=15, output=None, baseline=None):
+    modules = command_modules(target) or [target]
+    logger.info('Profiling import of {}'.format(', '.join(modules)))
+    profile = import_profile(modules, repeat)
+    report(profile, {m.split('.')[0] for m in modules}, top)
+    if baseline:
+        with open(baseline) as fh:
+            compare(profile, json.load(fh), top)
+    if output:
+        with open(output, 'w') as fh:
+            json.dump(profile, fh, indent=4, sort_keys=True)
+    return profile
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+
+from .. import utils as u
+
+
+def python_version_readiness(python, number):
+    version = python.split('/')[-1]
+    log_file_name = f'pvr.{version}.log'
+    if not os.path.exists(log_file_name):
+        packages = u.get_top_pypi_packages(count=number)
+    else:
+        packages = json.loads(open(log_file_name).read())
+
+    for index, package in enumerate(packages):
+        if index == number:
+            break
+
+        print(f'Status: - {index + 1}/{number}')
+
+        name = package['project']
+        is_ready = package.get('is_ready')
+
+        if is_ready is not None:
+            print(f'{name} - {is_ready}')
+            continue
+
+        print(f'Checking {name}')
+        cmd = f'{python} -m pip install {name}'
+        try:
+            output = u.run_shell_command(cmd)
+            is_ready = True
+        except subprocess.CalledProcessError:
+            is_ready = False
+            try:
+                print(output)
+            except:
+                pass
+
+        packages[index - 1]['is_ready'] = is_ready
+        with open(log_file_name, 'w') as fh:
+            fh.write(json.dumps(packages, indent=4))
+
+        print(f'{name} - {is_ready}')
@@ -0,0 +1,115 @@
+import calendar
+import csv
+import datetime as dt
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from dateutil import rrule
+
+from .. import pdfwriter
+
+
+logger = logging.getLogger(__name__)
+
+MARGIN = 72
+
+
+def receipt_page(name, amount, owner_name, address, date):
+    """
+    Return page content of the rent receipt of the month starting at date.
+    """
+    _, month_days = calendar.monthrange(date.year, date.month)
+    month_start = date.strftime('%d %B %Y')
+    month_end = (date + dt.timedelta(days=month_days - 1)).strftime('%d %B %Y')
+
+    page = pdfwriter.Page()
+    width, height = page.size
+    y = height - MARGIN - 18
+    page.text(MARGIN, y, [('RENT RECEIPT - {}'.format(date.strftime('%B %Y')), 'F2')], 16)
+    y = page.paragraph(MARGIN, y - 48, width - 2 * MARGIN, [
+        ('Received sum of ', 'F1'), ('Rs. {}'.format(amount), 'F2'),
+        (' from ', 'F1'), (name, 'F2'),
+        (' towards the rent of property located at ', 'F1'), (address, 'F2'),
+        (' for the period from ', 'F1'), (month_start, 'F2'),
+        (' to ', 'F1'), (month_end, 'F2'), ('.', 'F1'),
+    ], 11)
+    page.text(MARGIN, y - 60, [(owner_name, 'F2')], 11)
+    page.text(MARGIN, y - 76, [(month_end, 'F1')], 11)
+    return page.content()
+
+
+def tenant_receipts(tenant):
+    """
+    Return [(date, page content)] of the 12 receipts of a tenant's FY.
+    """
+    start_date = dt.date(tenant['year'], 4, 1)
+    return [
+        (date, receipt_page(tenant['name'], tenant['amount'], tenant['owner_name'], tenant['address'], date))
+        for date in rrule.rrule(freq=rrule.MONTHLY, count=12, dtstart=start_date)
+    ]
+
+
+def write_pdf(pdf_file, pages):
+    with open(pdf_file, 'wb') as fh:
+        fh.write(pdfwriter.document(pages))
+
+
+def rent_receipts(name, amount, owner_name, address, year):
+    tenant = {'name': name, 'amount': amount, 'owner_name': owner_name, 'address': address, 'year': year}
+    for date, page in tenant_receipts(tenant):
+        pdf_file = 'rent_receipt_{}.pdf'.format(date.strftime('%Y_%m'))
+        print('Generating {}'.format(pdf_file))
+        write_pdf(pdf_file, [page])
+
+
+def read_tenants(csv_file):
+    """
+    Read tenants from a csv with name, amount, owner_name, address and year
+    columns. Year is the start of the FY, 2016 or 2016-17.
+    """
+    with open(csv_file, newline='') as fh:
+        tenants = list(csv.DictReader(fh))
+    for line, tenant in enumerate(tenants, 2):
+        tenant['year'] = int(tenant['year'].strip()[:4])
+        # fail before generating anything, not halfway through the batch
+        for field in ('name', 'amount', 'owner_name', 'address'):
+            try:
+                pdfwriter.escape(tenant[field])
+            except ValueError as e:
+                raise ValueError('{}, line {}: {}'.format(csv_file, line, e))
+    return tenants
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+def batch_rent_receipts(csv_file, output_dir='.', combined=None, jobs=None):
+    """
+    Generate receipts of all tenants in a csv, one pdf per receipt in
+    output_dir or all of them in one `combined` pdf.
+    """
+    try:
+        tenants = read_tenants(csv_file)
+    except ValueError as e:
+        logger.error(e)
+        return
+    logger.info('Generating receipts for {} tenants'.format(len(tenants)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        receipts = list(pool.map(tenant_receipts, tenants, chunksize=16))
+
+    if combined:
+        write_pdf(combined, [page for pages in receipts for _, page in pages])
+        logger.info('Generated {}'.format(combined))
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    count = 0
+    for tenant, pages in zip(tenants, receipts):
+        for date, page in pages:
+            pdf_file = 'rent_receipt_{}_{}.pdf'.format(slugify(tenant['name']), date.strftime('%Y_%m'))
+            write_pdf(os.path.join(output_dir, pdf_file), [page])
+            count += 1
+    logger.info('Generated {} receipts in {}'.format(count, output_dir))
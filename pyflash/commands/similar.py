@@ -0,0 +1,172 @@
+"""
+Find resized, recompressed or re-exported copies of photos.
+
+Each photo gets a 64 bit difference hash (dHash), similar photos have
+hashes a few bits apart. Hashes go into a multi-index, so all pairs within
+a distance are found without comparing every photo with every other one.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from .. import utils as u
+from .duplicates import SAVE_EVERY, file_key
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PATTERNS = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.tif', '*.tiff', '*.bmp', '*.webp']
+HASH_SIZE = 8
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(values):
+    """
+    Number of set bits of each uint64 in an array.
+    """
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    return POPCOUNT[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1)
+
+
+def dhash(path, size=HASH_SIZE):
+    """
+    Difference hash of an image, one bit per horizontally adjacent pixel pair
+    of a (size + 1) x size grayscale thumbnail.
+    """
+    try:
+        with Image.open(path) as img:
+            # let the JPEG decoder scale down while decoding
+            img.draft('L', ((size + 1) * 8, size * 8))
+            pixels = list(img.convert('L').resize((size + 1, size), Image.BILINEAR).getdata())
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.error('Unable to read {}: {}'.format(path, e))
+        return None
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            value = value << 1 | (left > pixels[row * (size + 1) + col + 1])
+    return value
+
+
+class HammingIndex:
+    """
+    Multi-index hashing. Hashes within distance k differ in at most k bits,
+    so they are equal in at least one of k + 1 bands. Only hashes sharing a
+    band value are compared, which finds all close pairs of 200k hashes in
+    seconds where a BK-tree visits most of its nodes for every query.
+    """
+    def __init__(self, values, k):
+        self.values = np.asarray(values, dtype=np.uint64)
+        self.k = k
+        bits = 64 // (k + 1)
+        self.bands = []
+        for band in range(k + 1):
+            width = bits if band < k else 64 - bits * k
+            self.bands.append((bits * band, (1 << width) - 1))
+
+    def buckets(self):
+        """
+        Yield arrays of indexes of values sharing a band value.
+        """
+        for shift, mask in self.bands:
+            keys = (self.values >> np.uint64(shift)) & np.uint64(mask)
+            order = np.argsort(keys, kind='stable')
+            bounds = np.flatnonzero(np.diff(keys[order])) + 1
+            for bucket in np.split(order, bounds):
+                if len(bucket) > 1:
+                    yield bucket
+
+    def pairs(self, block=256):
+        """
+        Return (i, j) index pairs of values within distance k.
+        """
+        pairs = set()
+        for bucket in self.buckets():
+            values = self.values[bucket]
+            # compare in blocks of rows, so one huge bucket can't eat the memory
+            for start in range(0, len(bucket), block):
+                rows = values[start:start + block]
+                close = popcount(rows[:, None] ^ values[None, :]) <= self.k
+                close &= np.arange(len(bucket))[None, :] > np.arange(start, start + len(rows))[:, None]
+                for i, j in zip(*np.nonzero(close)):
+                    pairs.add((int(bucket[start + i]), int(bucket[j])))
+        return pairs
+
+
+def photo_hashes(directories, jobs=None):
+    """
+    Return {path: dhash} of photos, hashing only new or changed ones.
+    """
+    cache = u.get_cache()
+    keys = {}
+    for directory in directories:
+        for entry in u.scan_files(directory, IMAGE_PATTERNS, ignore_case=True):
+            keys[entry.path] = file_key('dhash', entry.stat())
+    cached = cache.get_many('dhash', keys.values())
+
+    hashes = {}
+    pending = []
+    for path, key in keys.items():
+        value = cached.get(key)
+        if value is None:
+            pending.append((path, key))
+        elif value >= 0:
+            hashes[path] = value
+    logger.info('Hashing {} of {} photos'.format(len(pending), len(keys)))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(dhash, [p[0] for p in pending], chunksize=64)
+            hashed = []
+            for (path, key), value in zip(pending, results):
+                # -1 remembers unreadable files until they change
+                hashed.append((key, -1 if value is None else value))
+                if value is not None:
+                    hashes[path] = value
+                if len(hashed) >= SAVE_EVERY:
+                    cache.set_many('dhash', hashed)
+                    hashed = []
+            cache.set_many('dhash', hashed)
+    return hashes
+
+
+def similar_groups(hashes, k):
+    """
+    Group paths whose hashes are within distance k, directly or through
+    other photos of the group.
+    """
+    by_hash = {}
+    for path, value in hashes.items():
+        by_hash.setdefault(value, []).append(path)
+    values = list(by_hash)
+
+    parent = list(range(len(values)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in HammingIndex(values, k).pairs():
+        parent[find(i)] = find(j)
+
+    groups = {}
+    for i, value in enumerate(values):
+        groups.setdefault(find(i), []).extend(by_hash[value])
+    return sorted((sorted(paths) for paths in groups.values() if len(paths) > 1), key=lambda g: (-len(g), g))
+
+
+def find_similar_photos(directories, k=4, jobs=None):
+    if not directories:
+        directories = [os.getcwd()]
+    hashes = photo_hashes(directories, jobs)
+    groups = similar_groups(hashes, k)
+    for group in groups:
+        print('\n'.join(group) + '\n')
+    logger.info('Found {} groups of similar photos'.format(len(groups)))
+    return groups
@@ -0,0 +1,158 @@
+"""
+Download subtitles for videos that don't have them yet.
+
+Scanned videos are kept in an index keyed by path, size and mtime, so
+videos are only guessed and hashed once. Videos with subtitles next to
+them are skipped and the ones no provider had subtitles for are retried
+after a week.
+"""
+import logging
+import mmap
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import utils as u
+
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK = 64 * 1024
+MISS_TTL = 7 * 24 * 60 * 60
+# same as subliminal's, which is only imported once there is something to
+# download
+VIDEO_EXTENSIONS = (
+    '.3g2', '.3gp', '.3gp2', '.3gpp', '.60d', '.ajp', '.asf', '.asx', '.avchd', '.avi', '.bik', '.bix', '.box',
+    '.cam', '.dat', '.divx', '.dmf', '.dv', '.dvr-ms', '.evo', '.flc', '.fli', '.flic', '.flv', '.flx', '.gvi',
+    '.gvp', '.h264', '.m1v', '.m2p', '.m2ts', '.m2v', '.m4e', '.m4v', '.mjp', '.mjpeg', '.mjpg', '.mkv', '.moov',
+    '.mov', '.movhd', '.movie', '.movx', '.mp4', '.mpe', '.mpeg', '.mpg', '.mpv', '.mpv2', '.mxf', '.nsv', '.nut',
+    '.ogg', '.ogm', '.ogv', '.omf', '.ps', '.qt', '.ram', '.rm', '.rmvb', '.swf', '.ts', '.vfw', '.vid', '.video',
+    '.viv', '.vivo', '.vob', '.vro', '.wm', '.wmv', '.wmx', '.wrap', '.wvx', '.wx', '.x264', '.xvid',
+)
+SUBTITLE_EXTENSIONS = ('.srt', '.sub', '.smi', '.txt', '.ssa', '.ass', '.mpl')
+
+
+def hash_opensubtitles(path, size):
+    """
+    OpenSubtitles hash, the file size plus the sum of the first and last
+    64KB as little endian 64 bit integers.
+    """
+    if size < 2 * HASH_BLOCK:
+        return None
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        words = struct.Struct('<{}Q'.format(HASH_BLOCK // 8))
+        value = size + sum(words.unpack(m[:HASH_BLOCK])) + sum(words.unpack(m[size - HASH_BLOCK:size]))
+    return '%016x' % (value & 0xFFFFFFFFFFFFFFFF)
+
+
+def scan_video(path, size):
+    """
+    Same as subliminal's scan_video, with the hashes read through mmap.
+    """
+    from guessit import guessit
+    from subliminal.utils import hash_napiprojekt, hash_shooter, hash_thesubdb
+    from subliminal.video import Video
+
+    video = Video.fromguess(path, guessit(path))
+    video.size = size
+    # subliminal doesn't hash videos under 10MB either
+    if size > 10 * 1024 * 1024:
+        video.hashes['opensubtitles'] = hash_opensubtitles(path, size)
+        video.hashes['shooter'] = hash_shooter(path)
+        video.hashes['thesubdb'] = hash_thesubdb(path)
+        video.hashes['napiprojekt'] = hash_napiprojekt(path)
+    return video
+
+
+def videos_without_subtitles(directory):
+    """
+    Yield entries of videos without subtitle files next to them. Like
+    subliminal, Movie.en.srt and Movie.srt are subtitles of Movie.mkv.
+    """
+    videos = []
+    roots = set()
+    for entry in u.scan_files(directory):
+        if entry.name.endswith(VIDEO_EXTENSIONS):
+            videos.append(entry)
+        elif entry.name.endswith(SUBTITLE_EXTENSIONS):
+            root = os.path.splitext(entry.path)[0]
+            while True:
+                roots.add(root)
+                root, ext = os.path.splitext(root)
+                if not ext:
+                    break
+    for entry in videos:
+        if os.path.splitext(entry.path)[0] not in roots:
+            yield entry
+
+
+def index_videos(entries, cache):
+    """
+    Return subliminal videos of entries, scanning only new or changed ones.
+    """
+    videos = []
+    scanned = 0
+    for entry in entries:
+        stat = entry.stat()
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = cache.get('subtitle_videos', entry.path)
+        if cached and cached[0] == key:
+            videos.append(cached[1])
+            continue
+        try:
+            video = scan_video(entry.path, stat.st_size)
+        except (OSError, ValueError) as e:
+            logger.error('Unable to scan {}: {}'.format(entry.path, e))
+            continue
+        cache.set('subtitle_videos', entry.path, (key, video))
+        videos.append(video)
+        scanned += 1
+    logger.info('Scanned {} new videos'.format(scanned))
+    return videos
+
+
+def videos_to_search(directory, cache):
+    """
+    Entries of videos without subtitles, leaving out the ones no provider
+    had subtitles for in the last MISS_TTL.
+    """
+    entries = list(videos_without_subtitles(directory))
+    misses = cache.get_many('subtitle_misses', [entry.path for entry in entries])
+    return [entry for entry in entries if entry.path not in misses]
+
+
+def download_subtitles(directory, jobs=4):
+    if not directory:
+        directory = os.getcwd()
+    logger.info('Downloading subtitles for videos in {}'.format(directory))
+
+    cache = u.get_cache()
+    entries = videos_to_search(directory, cache)
+    if not entries:
+        return
+
+    import babelfish
+    from subliminal import download_best_subtitles, region, save_subtitles
+
+    backend = 'dogpile.cache.dbm'
+    cache_file = u.get_cache_file('subliminal.cache')
+    region.configure(backend, arguments={'filename': cache_file})
+
+    videos = index_videos(entries, cache)
+    if not videos:
+        return
+    logger.info('Searching subtitles for {} videos'.format(len(videos)))
+
+    languages = {babelfish.Language('eng')}
+    # every chunk gets its own provider pool, providers aren't thread safe
+    chunks = [videos[i::jobs] for i in range(min(jobs, len(videos)))]
+    saved = set()
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        for subtitles in pool.map(lambda chunk: download_best_subtitles(chunk, languages), chunks):
+            for video, video_subtitles in subtitles.items():
+                if video_subtitles:
+                    save_subtitles(video, video_subtitles, single=True)
+                    saved.add(video.name)
+    misses = [(video.name, True) for video in videos if video.name not in saved]
+    cache.set_many('subtitle_misses', misses, ttl=MISS_TTL)
+    logger.info('Downloaded subtitles for {} of {} videos'.format(len(saved), len(videos)))
@@ -0,0 +1,166 @@
+"""
+Read ebook meta data without spawning calibre.
+
+Readers return the same keys as `ebook-meta` prints (Title, Author(s), ...)
+and raise `UnsupportedFormat` when they can't handle a file.
+"""
+import os
+import struct
+import zipfile
+import xml.etree.ElementTree as ET
+
+
+class UnsupportedFormat(Exception):
+    pass
+
+
+DC = '{http://purl.org/dc/elements/1.1/}'
+CONTAINER = '{urn:oasis:names:tc:opendocument:xmlns:container}'
+
+
+def _meta(title=None, authors=(), publisher=None, languages=(), published=None, tags=(), identifiers=()):
+    meta_data = {}
+    items = [
+        ('Title', title),
+        ('Author(s)', ' & '.join(authors)),
+        ('Publisher', publisher),
+        ('Languages', ', '.join(languages)),
+        ('Published', published),
+        ('Tags', ', '.join(tags)),
+        ('Identifiers', ', '.join(identifiers)),
+    ]
+    for key, value in items:
+        if value:
+            meta_data[key] = str(value).strip()
+    return meta_data
+
+
+def epub_meta_data(filename):
+    try:
+        with zipfile.ZipFile(filename) as zf:
+            container = ET.fromstring(zf.read('META-INF/container.xml'))
+            rootfile = container.find('.//{}rootfile'.format(CONTAINER))
+            opf_path = rootfile.get('full-path')
+            opf = ET.fromstring(zf.read(opf_path))
+    except (zipfile.BadZipFile, KeyError, AttributeError, ET.ParseError) as e:
+        raise UnsupportedFormat(e)
+
+    def texts(tag):
+        return [el.text for el in opf.iter(DC + tag) if el.text]
+
+    titles = texts('title')
+    return _meta(
+        title=titles[0] if titles else None,
+        authors=texts('creator'),
+        publisher=next(iter(texts('publisher')), None),
+        languages=texts('language'),
+        published=next(iter(texts('date')), None),
+        tags=texts('subject'),
+        identifiers=texts('identifier'),
+    )
+
+
+def pdf_meta_data(filename):
+    import PyPDF2
+
+    try:
+        reader = PyPDF2.PdfReader(filename)
+        info = reader.metadata or {}
+        xmp = reader.xmp_metadata
+    except Exception as e:
+        raise UnsupportedFormat(e)
+
+    title = info.get('/Title')
+    authors = [info['/Author']] if info.get('/Author') else []
+    published = info.get('/CreationDate')
+    tags = []
+    if xmp is not None:
+        if not title and xmp.dc_title:
+            title = xmp.dc_title.get('x-default') or next(iter(xmp.dc_title.values()), None)
+        if not authors and xmp.dc_creator:
+            authors = list(xmp.dc_creator)
+        tags = list(xmp.dc_subject or [])
+
+    return _meta(title=title, authors=authors, published=published, tags=tags)
+
+
+EXTH_AUTHOR = 100
+EXTH_PUBLISHER = 101
+EXTH_SUBJECT = 105
+EXTH_PUBLISHED = 106
+EXTH_ISBN = 104
+EXTH_TITLE = 503
+EXTH_LANGUAGE = 524
+
+
+def mobi_meta_data(filename):
+    with open(filename, 'rb') as fh:
+        header = fh.read(78)
+        if len(header) < 78 or header[60:68] not in (b'BOOKMOBI', b'TEXtREAd'):
+            raise UnsupportedFormat('{} is not a mobi file'.format(filename))
+        records, = struct.unpack('>H', header[76:78])
+        if not records:
+            raise UnsupportedFormat('{} has no records'.format(filename))
+        offsets = fh.read(8 * min(records, 2))
+        start = struct.unpack('>L', offsets[:4])[0]
+        end = struct.unpack('>L', offsets[8:12])[0] if records > 1 else os.fstat(fh.fileno()).st_size
+        fh.seek(start)
+        record = fh.read(end - start)
+
+    if len(record) < 132 or record[16:20] != b'MOBI':
+        raise UnsupportedFormat('{} has no MOBI header'.format(filename))
+    try:
+        title, exth = _mobi_header(record)
+    except struct.error as e:
+        raise UnsupportedFormat(e)
+
+    return _meta(
+        title=title,
+        authors=exth.get(EXTH_AUTHOR, []),
+        publisher=exth.get(EXTH_PUBLISHER, [None])[0],
+        languages=exth.get(EXTH_LANGUAGE, []),
+        published=exth.get(EXTH_PUBLISHED, [None])[0],
+        tags=exth.get(EXTH_SUBJECT, []),
+        identifiers=['isbn:{}'.format(i) for i in exth.get(EXTH_ISBN, [])],
+    )
+
+
+def _mobi_header(record):
+    mobi_length, _, encoding = struct.unpack('>LLL', record[20:32])
+    encoding = 'utf-8' if encoding == 65001 else 'cp1252'
+    name_offset, name_length = struct.unpack('>LL', record[84:92])
+    exth_flags, = struct.unpack('>L', record[128:132])
+
+    exth = {}
+    if exth_flags & 0x40:
+        pos = 16 + mobi_length
+        if record[pos:pos + 4] == b'EXTH':
+            count, = struct.unpack('>L', record[pos + 8:pos + 12])
+            pos += 12
+            for _ in range(count):
+                kind, length = struct.unpack('>LL', record[pos:pos + 8])
+                value = record[pos + 8:pos + length].decode(encoding, 'replace')
+                exth.setdefault(kind, []).append(value)
+                pos += length
+
+    title = exth.get(EXTH_TITLE, [None])[0]
+    if not title:
+        title = record[name_offset:name_offset + name_length].decode(encoding, 'replace')
+    return title, exth
+
+
+READERS = {
+    '.epub': epub_meta_data,
+    '.pdf': pdf_meta_data,
+    '.mobi': mobi_meta_data,
+    '.azw': mobi_meta_data,
+    '.azw3': mobi_meta_data,
+}
+
+
+def meta_data(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    reader = READERS.get(ext)
+    if not reader:
+        raise UnsupportedFormat('No reader for {}'.format(filename))
+    return reader(filename)
@@ -0,0 +1,167 @@
+"""
+Move files in batches.
+
+Moves within a device are plain renames. Moves across devices copy the
+data in the kernel with copy_file_range/sendfile on a thread pool, keep
+the metadata and only remove the source once the copy is complete.
+"""
+import errno
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+logger = logging.getLogger(__name__)
+
+# errors that mean the fast copy isn't supported for these files
+UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSOCK}
+
+
+def _copy_file_range(src, dst, size):
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(src, dst, size - offset)
+        if not copied:
+            break
+        offset += copied
+
+
+def _sendfile(src, dst, size):
+    offset = 0
+    while offset < size:
+        copied = os.sendfile(dst, src, offset, size - offset)
+        if not copied:
+            break
+        offset += copied
+
+
+def _read_write(src, dst, size):
+    while True:
+        data = os.read(src, 1024 * 1024)
+        if not data:
+            break
+        os.write(dst, data)
+
+
+def copy_data(src, dst, size):
+    """
+    Copy `size` bytes between file descriptors with the fastest method the
+    platform supports.
+    """
+    methods = [_read_write]
+    if hasattr(os, 'sendfile'):
+        methods.insert(0, _sendfile)
+    if hasattr(os, 'copy_file_range'):
+        methods.insert(0, _copy_file_range)
+    for method in methods[:-1]:
+        try:
+            return method(src, dst, size)
+        except OSError as e:
+            if e.errno not in UNSUPPORTED:
+                raise
+            os.lseek(src, 0, os.SEEK_SET)
+            os.lseek(dst, 0, os.SEEK_SET)
+            os.ftruncate(dst, 0)
+    return methods[-1](src, dst, size)
+
+
+def copy_file(source, target):
+    """
+    Copy source to target with its metadata. Data goes to a temporary file
+    first, so target never holds a partial copy.
+    """
+    tmp = target + '.pyflash-part'
+    try:
+        with open(source, 'rb') as fsrc, open(tmp, 'wb') as fdst:
+            copy_data(fsrc.fileno(), fdst.fileno(), os.fstat(fsrc.fileno()).st_size)
+        shutil.copystat(source, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _move_across(source, target):
+    copy_file(source, target)
+    os.remove(source)
+
+
+def free_name(path, taken):
+    """
+    Path, or path with a -1, -2, ... suffix if it exists or is taken.
+    """
+    base, ext = os.path.splitext(path)
+    copy = 0
+    while path in taken or os.path.lexists(path):
+        copy += 1
+        path = '{}-{}{}'.format(base, copy, ext)
+    taken.add(path)
+    return path
+
+
+def move_files(moves, jobs=4):
+    """
+    Move [(source, target)] files, target may be a directory. Returns the
+    [(source, target)] moves that succeeded, errors are logged.
+    """
+    start = time.monotonic()
+    taken = set()
+    devices = {}
+    renames = []
+    copies = []
+    for source, target in moves:
+        if target.endswith(os.sep) or os.path.isdir(target):
+            target = os.path.join(target, os.path.basename(source))
+        target_dir = os.path.dirname(os.path.abspath(target))
+        try:
+            if target_dir not in devices:
+                os.makedirs(target_dir, exist_ok=True)
+                devices[target_dir] = os.stat(target_dir).st_dev
+            stat = os.stat(source)
+        except OSError as e:
+            logger.error('Unable to move {}: {}'.format(source, e))
+            continue
+        if os.path.abspath(source) == os.path.abspath(target):
+            continue
+        target = free_name(target, taken)
+        if stat.st_dev == devices[target_dir]:
+            renames.append((source, target))
+        else:
+            copies.append((source, target, stat.st_size))
+
+    done = []
+    for source, target in renames:
+        try:
+            os.rename(source, target)
+        except OSError as e:
+            logger.error('Unable to move {}: {}'.format(source, e))
+            continue
+        done.append((source, target))
+    renamed = len(done)
+
+    size = 0
+    if copies:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(_move_across, source, target): (source, target, file_size)
+                       for source, target, file_size in copies}
+            for future in as_completed(futures):
+                source, target, file_size = futures[future]
+                try:
+                    future.result()
+                except OSError as e:
+                    logger.error('Unable to move {}: {}'.format(source, e))
+                    continue
+                size += file_size
+                done.append((source, target))
+
+    if len(done) > renamed:
+        elapsed = time.monotonic() - start
+        logger.info('Copied {} files across devices, {:.1f} MB in {:.1f}s ({:.1f} MB/s)'.format(
+            len(done) - renamed, size / 1024 / 1024, elapsed, size / 1024 / 1024 / elapsed if elapsed else 0,
+        ))
+    if renamed:
+        logger.info('Renamed {} files'.format(renamed))
+    return done
@@ -0,0 +1,138 @@
+"""
+Minimal PDF writer for text documents.
+
+Pages are drawn with the standard Helvetica fonts, which every PDF viewer
+has, so nothing is embedded. Page contents are plain bytes and can be
+rendered in other processes and assembled into a document later.
+"""
+import io
+
+
+# widths of chars 32..126 in 1/1000 em, from the Adobe font metrics
+HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+HELVETICA_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+FONTS = {
+    'F1': ('Helvetica', HELVETICA),
+    'F2': ('Helvetica-Bold', HELVETICA_BOLD),
+}
+A4 = (595, 842)
+
+
+def text_width(text, font, size):
+    widths = FONTS[font][1]
+    return sum(widths[ord(c) - 32] if 32 <= ord(c) <= 126 else 556 for c in text) * size / 1000
+
+
+def escape(text):
+    """
+    Encode text for a PDF string. The standard fonts only cover cp1252, so
+    other characters raise a ValueError instead of turning into '?'.
+    """
+    try:
+        encoded = text.encode('cp1252')
+    except UnicodeEncodeError as e:
+        raise ValueError('Unable to write {!r} with the standard PDF fonts, {!r} is not supported'.format(
+            text, text[e.start:e.end],
+        ))
+    return encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+class Page:
+    def __init__(self, size=A4):
+        self.size = size
+        self.ops = []
+
+    def text(self, x, y, runs, size):
+        """
+        Draw [(text, font)] runs on one line starting at x, y.
+        """
+        self.ops.append(b'BT %.2f %.2f Td' % (x, y))
+        for text, font in runs:
+            self.ops.append(b'/%s %.2f Tf (%s) Tj' % (font.encode(), size, escape(text)))
+        self.ops.append(b'ET')
+
+    def paragraph(self, x, y, width, runs, size, leading=None):
+        """
+        Draw [(text, font)] runs wrapped to width, returns y below the last
+        line.
+        """
+        leading = leading or size * 1.4
+        words = []
+        for text, font in runs:
+            for i, word in enumerate(text.split(' ')):
+                if i and words:
+                    words[-1] = (words[-1][0] + ' ', words[-1][1])
+                if word:
+                    words.append((word, font))
+
+        line = []
+        line_width = 0
+        for word, font in words:
+            word_width = text_width(word.rstrip(), font, size)
+            if line and line_width + word_width > width:
+                self.text(x, y, line, size)
+                y -= leading
+                line = []
+                line_width = 0
+            line.append((word, font))
+            line_width += text_width(word, font, size)
+        if line:
+            self.text(x, y, line, size)
+            y -= leading
+        return y
+
+    def content(self):
+        return b'\n'.join(self.ops)
+
+
+def document(pages, size=A4):
+    """
+    Return a PDF of page contents as bytes.
+    """
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,
+    ]
+    fonts = []
+    for name, (base_font, _) in sorted(FONTS.items()):
+        objects.append(
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % base_font.encode(),
+        )
+        fonts.append(b'/%s %d 0 R' % (name.encode(), len(objects)))
+    resources = b'<< /Font << %s >> >>' % b' '.join(fonts)
+
+    kids = []
+    for content in pages:
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content))
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>' % (
+            size[0], size[1], resources, len(objects),
+        ))
+        kids.append(b'%d 0 R' % len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(kids), len(kids))
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (number, obj))
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
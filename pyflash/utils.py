@@ -1,28 +1,22 @@
 import contextlib
-import glob
+import fnmatch
 import logging
 import os
 import pathlib
+import re
 import sys
 import shlex
-import shutil
 import socket
 import struct
 import subprocess
+import threading
+import time
 from enum import Enum
 from os.path import expanduser
-# from urllib.parse import quote_plus
-import pickle
-import collections
+from urllib.parse import quote_plus
 import operator
 
 import fcntl
-import requests
-try:
-    import guessit
-    import psycopg2
-except:
-    pass
 
 
 logger = logging.getLogger(__name__)
@@ -52,6 +46,13 @@ def cd(directory):
 
 
 def ebook_meta_data(filename):
+    from . import ebooks
+
+    try:
+        return ebooks.meta_data(filename)
+    except ebooks.UnsupportedFormat as e:
+        logger.debug(e)
+
     cmd = 'ebook-meta "{}"'.format(filename)
     output = run_shell_command(cmd)
     split_strs = (line.split(' : ') for line in output.split('\n') if line)
@@ -59,23 +60,96 @@ def ebook_meta_data(filename):
     return meta_data
 
 
+def scan_files(root_dir, patterns=None, exclude=(), hidden=False, ignore_case=False):
+    """
+    Walk `root_dir` once and yield `os.DirEntry` of files matching any of the
+    glob `patterns`. Hidden directories and the ones named in `exclude` are
+    pruned. Entries cache their stat data, so `entry.stat()` is cheap, and
+    broken symlinks or files removed during the walk are skipped.
+    """
+    match = None
+    if patterns:
+        regex = '|'.join(fnmatch.translate(pattern) for pattern in patterns)
+        match = re.compile(regex, re.IGNORECASE if ignore_case else 0).match
+
+    stack = [root_dir]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.error(e)
+            continue
+        for entry in entries:
+            if not hidden and entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in exclude:
+                    stack.append(entry.path)
+            elif match is None or match(entry.name):
+                try:
+                    entry.stat()
+                except OSError as e:
+                    logger.error(e)
+                    continue
+                yield entry
+
+
 def matched_files(patterns, root_dir):
-    for pattern in patterns:
-        path = os.path.join(root_dir, '**', pattern)
-        for filename in glob.iglob(path, recursive=True):
-            yield filename
+    for entry in scan_files(root_dir, patterns):
+        yield entry.path
 
 
-def convert_books(directory, source='.epub', target='.mobi'):
-    patterns = ['*{}'.format(source)]
-    files = matched_files(patterns, directory)
-    for filename in files:
-        file_path, ext = os.path.splitext(filename)
-        target_file = file_path + target
-        command = ['ebook-convert', filename, target_file]
-        logger.info(command)
-        subprocess.check_output(command)
-        shutil.move(filename, "/tmp/")
+def convert_book(filename, target_file):
+    """
+    Convert `filename` to `target_file` unless an up to date target exists.
+    """
+    try:
+        if os.stat(target_file).st_mtime >= os.stat(filename).st_mtime:
+            logger.info('Skipping {}, already converted'.format(filename))
+            return
+    except FileNotFoundError:
+        pass
+    command = ['ebook-convert', filename, target_file]
+    logger.info(command)
+    subprocess.check_output(command, stderr=subprocess.STDOUT)
+
+
+def convert_books(directory, source='.epub', target='.mobi', files=None, jobs=None):
+    """
+    Convert books in `directory` (or the given `files`) from `source` to
+    `target` format with `jobs` parallel workers and return the converted
+    file names. Failed conversions are logged at the end.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    from . import mover
+
+    if files is None:
+        files = matched_files(['*{}'.format(source)], directory)
+    converted = []
+    done = []
+    failed = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {}
+        for filename in files:
+            target_file = os.path.splitext(filename)[0] + target
+            futures[pool.submit(convert_book, filename, target_file)] = (filename, target_file)
+        for future in as_completed(futures):
+            filename, target_file = futures[future]
+            try:
+                future.result()
+            except (OSError, subprocess.CalledProcessError) as e:
+                failed.append((filename, e))
+                continue
+            converted.append(target_file)
+            done.append((filename, '/tmp/'))
+    mover.move_files(done)
+
+    for filename, error in failed:
+        logger.error('Failed to convert {}: {}'.format(filename, error))
+    return converted
 
 
 def get_ip(iface='wlo1'):
@@ -93,18 +167,6 @@ def get_ip(iface='wlo1'):
     return socket.inet_ntoa(ip)
 
 
-def ping(host, port=80):
-    print(host)
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(2)
-        sock.connect((host, port))
-        sock.close()
-        return True
-    except Exception as e:
-        return False
-
-
 def envar(var):
     var = var.upper()
     var = os.environ.get(var, None)
@@ -127,19 +189,25 @@ def execute_shell_command(cmd):
     subprocess.run(cmd, stdout=sys.stdout, stderr=sys.stdout)
 
 
-def get_active_hosts(network):
-    cmd = 'nmap -sP {}'.format(network)
-    out = run_shell_command(cmd)
-    return out
-
-
 def file_list(directory):
     """
     Recursively yield full path of files in a directory.
     """
-    for root_dir, subdirs, files in os.walk(directory):
-        for fname in files:
-            yield os.path.join(root_dir, fname)
+    for entry in scan_files(directory, hidden=True):
+        yield entry.path
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive lock on `path` across processes.
+    """
+    with open(path, 'a') as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
 
 
 def get_cache_file(filename):
@@ -148,14 +216,45 @@ def get_cache_file(filename):
     file_path = '{}/{}'.format(cache_dir, filename)
     file_path = expanduser(file_path)
     if not os.path.exists(file_path):
-        if file_path.endswith('.pkl'):
-            with open(file_path, 'wb') as fh:
-                pickle.dump(collections.defaultdict(dict), fh)
-        else:
-            pathlib.Path(file_path).touch()
+        pathlib.Path(file_path).touch()
     return file_path
 
 
+_cache = None
+_catalog = None
+
+
+def cache_limits(config_file='~/.pyflash.ini'):
+    """
+    Entry limits from the [cache] section of the config, `max_entries` for
+    every namespace or the name of a namespace.
+    """
+    import configparser
+
+    config = configparser.ConfigParser()
+    config.read(expanduser(config_file))
+    if not config.has_section('cache'):
+        return {}
+    return {name: config.getint('cache', name) for name in config['cache']}
+
+
+def get_cache():
+    """
+    Return the shared pyflash cache, migrating the old pickle cache on
+    first use.
+    """
+    global _cache
+    if _cache is None:
+        from .cache import Cache
+
+        limits = cache_limits()
+        _cache = Cache(get_cache_file('pyflash.db'), limits.pop('max_entries', 100000), limits)
+        pickle_file = expanduser('~/.cache/pyflash.pkl')
+        if os.path.exists(pickle_file):
+            _cache.migrate(pickle_file)
+    return _cache
+
+
 def guess_file_type(file):
     ext = file.split('.')[-1].lower()
     if ext in {'png', 'jpg'}:
@@ -166,28 +265,95 @@ def guess_file_type(file):
         return FileType.BOOK
 
 
+def relocate_files(files, jobs=4):
+    """
+    Move files to the target directory of their type in one batch.
+    """
+    from . import mover
+
+    moves = []
+    for file in files:
+        f_type = guess_file_type(file)
+        if not f_type:
+            continue
+        target_dir = TARGET_DIRS[f_type]
+        logger.info('Relocating {} -> {}'.format(file, target_dir))
+        moves.append((file, target_dir))
+    return mover.move_files(moves, jobs)
+
+
 def relocate_file(file):
-    f_type = guess_file_type(file)
-    if not f_type:
-        return
-    target_dir = TARGET_DIRS[f_type]
-    logger.info('Relocating {} -> {}'.format(file, target_dir))
-    shutil.move(file, os.path.join(target_dir))
+    return relocate_files([file])
+
+
+MISSING = object()
+# seconds to connect and between bytes read, requests waits forever by default
+HTTP_TIMEOUT = (10, 30)
 
 
-def movie_info(title):
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        from .catalog import Catalog
+
+        _catalog = Catalog(get_cache_file('media.db'))
+    return _catalog
+
+
+def http_session(pool_size=10, retries=3, backoff=0.5):
+    """
+    Return a requests session that reuses up to `pool_size` connections per
+    host and retries failed idempotent requests with exponential backoff.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504)) if retries else 0
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class RateLimiter:
+    """
+    Allow at most `rate` calls per second across threads.
+    """
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_call = 0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            delay = max(0, self.next_call - now)
+            self.next_call = max(now, self.next_call) + self.interval
+        time.sleep(delay)
+
+
+def movie_info(title, session=None, limiter=None):
     cache = get_cache()
-    try:
-        data = cache['omdbapi'][title]
-    except KeyError:
+    data = cache.get('omdbapi', title, MISSING)
+    if data is MISSING:
+        if session is None:
+            session = http_session()
+        if limiter:
+            limiter.wait()
+
         url = 'http://www.omdbapi.com/?t={}'.format(quote_plus(title))
         logger.info('Fetching {}'.format(url))
-        response = requests.get(url)
+        response = session.get(url, timeout=HTTP_TIMEOUT)
         data = response.json()
         if 'Error' in data:
             data = None
-        cache['omdbapi'][title] = data
-        update_cache(cache)
+        # retry unknown titles once in a while, they may get listed later
+        ttl = None if data else 7 * 24 * 3600
+        cache.set('omdbapi', title, data, ttl=ttl)
 
     return data
 
@@ -248,19 +414,9 @@ def validateVerhoeff(number):
     return checksum(number) == 0
 
 
-def get_cache():
-    cache_file = get_cache_file('pyflash.pkl')
-    with open(cache_file, 'rb') as fh:
-        return pickle.load(fh)
-
-
-def update_cache(cache):
-    cache_file = get_cache_file('pyflash.pkl')
-    with open(cache_file, 'wb') as fh:
-        return pickle.dump(cache, fh)
-
-
 def get_title(file):
+    import guessit
+
     movie = guessit.guessit(file)
     container = movie.get('container', None)
     if container and container in {'srt'}:
@@ -276,6 +432,8 @@ def ensure_dir(directory):
 
 class PGStats:
     def __init__(self, uri=None):
+        import psycopg2
+
         self.uri = uri
         self.conn = psycopg2.connect(uri)
         self.conn.set_session(readonly=True, autocommit=True)
@@ -326,6 +484,8 @@ class PGStats:
 
 
 def get_top_pypi_packages(count):
+    import requests
+
     url = 'https://hugovk.github.io/top-pypi-packages/top-pypi-packages-30-days.min.json'
     response = requests.get(url)
     data = response.json()
@@ -0,0 +1,40 @@
+import pytest
+
+from pyflash import utils
+from pyflash.cache import Cache
+
+
+class FakePool:
+    """
+    Executor running map in the test process, so monkeypatched functions
+    and lambdas can be used.
+    """
+    def __init__(self, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def map(self, func, *iterables, chunksize=1):
+        return map(func, *iterables)
+
+
+@pytest.fixture
+def cache(tmpdir, monkeypatch):
+    cache = Cache(str(tmpdir.join('cache.db')))
+    monkeypatch.setattr(utils, '_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """
+    Replace ProcessPoolExecutor of the given modules with FakePool.
+    """
+    def patch(*modules):
+        for module in modules:
+            monkeypatch.setattr(module, 'ProcessPoolExecutor', FakePool)
+    return patch
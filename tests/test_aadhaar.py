@@ -0,0 +1,77 @@
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from pyflash import utils as u, verhoeff
+from pyflash.commands import aadhaar
+
+
+def random_numbers(count):
+    random.seed(1)
+    numbers = [''.join(random.choice('0123456789') for _ in range(11)) for _ in range(count)]
+    # make about half of them valid
+    return [n + (str(u.checksum(n)) if i % 2 else random.choice('0123456789')) for i, n in enumerate(numbers)]
+
+
+def test_validate_chunk():
+    numbers = random_numbers(500)
+    expected = [n for n in numbers if u.validateVerhoeff(n)]
+    valid, invalid = verhoeff.validate_chunk(''.join(n + '\n' for n in numbers).encode())
+    assert valid.decode().split() == expected
+    assert len(invalid.decode().split()) == len(numbers) - len(expected)
+
+    lines = ['{} {} {}'.format(n[:4], n[4:8], n[8:]) for n in numbers] + ['', '12345', 'abcdabcdabcd']
+    valid, invalid = verhoeff.validate_chunk('\r\n'.join(lines).encode() + b'\n')
+    assert [line.replace(' ', '') for line in valid.decode().splitlines()] == expected
+    assert len(invalid.decode().splitlines()) == len(numbers) - len(expected) + 2
+
+
+def test_validate_aadhaar_file(tmpdir):
+    numbers = random_numbers(100)
+    source = tmpdir.join('people.csv')
+    source.write('name,aadhaar\n' + ''.join('p{},{}\n'.format(i, n) for i, n in enumerate(numbers)))
+    valid = tmpdir.join('valid.csv')
+
+    counts = aadhaar.validate_aadhaar_file(str(source), valid=str(valid), column='aadhaar')
+    expected = [n for n in numbers if u.validateVerhoeff(n)]
+    assert counts == [len(expected), len(numbers) - len(expected)]
+    rows = valid.read().splitlines()
+    assert rows[0] == 'name,aadhaar'
+    assert [row.split(',')[1] for row in rows[1:]] == expected
+
+    with pytest.raises(ValueError, match="No column 'nope'.*name, aadhaar"):
+        aadhaar.validate_aadhaar_file(str(source), column='nope')
+
+
+def test_validate_aadhaar_file_in_chunks(tmpdir, monkeypatch):
+    monkeypatch.setattr(aadhaar, 'CHUNK_SIZE', 256)
+    numbers = random_numbers(300)
+    expected = [n for n in numbers if u.validateVerhoeff(n)]
+
+    source = tmpdir.join('numbers.txt')
+    source.write(''.join(n + '\n' for n in numbers))
+    valid = tmpdir.join('valid.txt')
+    counts = aadhaar.validate_aadhaar_file(str(source), valid=str(valid), jobs=2)
+    assert counts == [len(expected), len(numbers) - len(expected)]
+    assert valid.read().split() == expected
+
+    # quoted fields may hold newlines, chunks must not split them
+    source = tmpdir.join('people.csv')
+    source.write('"full\nname",id\n' + ''.join('"p\n{}",{}\n'.format(i, n) for i, n in enumerate(numbers)))
+    invalid = tmpdir.join('invalid.csv')
+    counts = aadhaar.validate_aadhaar_file(str(source), invalid=str(invalid), column='id', jobs=2)
+    assert counts == [len(expected), len(numbers) - len(expected)]
+    with open(str(invalid), newline='') as fh:
+        rows = list(aadhaar.csv.reader(fh))
+    assert rows[0] == ['full\nname', 'id']
+    assert [row[1] for row in rows[1:]] == [n for n in numbers if n not in expected]
+    assert rows[1][0] == 'p\n0'
+
+
+def test_validate_aadhaar_does_not_import_numpy():
+    code = 'import sys, pyflash.commands.aadhaar; print("numpy" in sys.modules)'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert subprocess.check_output([sys.executable, '-c', code], cwd=root).strip() == b'False'
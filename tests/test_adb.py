@@ -0,0 +1,44 @@
+import asyncio
+import socket
+
+import pytest
+
+from pyflash.commands import adb
+
+
+@pytest.fixture
+def device():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(16)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def test_scan(device):
+    hosts = ['127.0.0.1', '127.0.0.2']
+    assert asyncio.run(adb.scan(hosts, device, timeout=1, concurrency=1)) == ['127.0.0.1']
+
+
+def test_adb_connect(cache, device, monkeypatch):
+    connected = []
+
+    async def connect(host, port):
+        connected.append((host, port))
+        return 'connected to {}:{}'.format(host, port)
+
+    monkeypatch.setattr(adb, 'connect', connect)
+    assert adb.adb_connect(network='127.0.0.0/30', port=device) == ['127.0.0.1']
+    assert connected == [('127.0.0.1', device)]
+    assert cache.get('adb_devices', '127.0.0.0/30') == ['127.0.0.1']
+
+    scanned = []
+    real_scan = adb.scan
+
+    async def scan(hosts, *args):
+        scanned.append(hosts)
+        return await real_scan(hosts, *args)
+
+    monkeypatch.setattr(adb, 'scan', scan)
+    adb.adb_connect(network='127.0.0.0/30', port=device)
+    assert scanned == [['127.0.0.1']]
@@ -0,0 +1,35 @@
+import os
+
+from pyflash import utils
+from pyflash.cache import Cache
+from pyflash.commands import books
+
+
+def test_books_meta_data_cache(tmpdir, monkeypatch):
+    root = str(tmpdir.mkdir('books'))
+    for name in ('a.epub', 'b.pdf'):
+        with open(os.path.join(root, name), 'w') as fh:
+            fh.write(name)
+
+    calls = []
+
+    def meta_data(path):
+        calls.append(path)
+        return {'Title': os.path.basename(path)}
+
+    monkeypatch.setattr(utils, 'ebook_meta_data', meta_data)
+    cache = Cache(str(tmpdir.join('cache.db')))
+    files = list(utils.scan_files(root, ['*.epub', '*.pdf']))
+    result = books.books_meta_data(files, cache, jobs=2)
+    assert sorted(m['Title'] for m in result.values()) == ['a.epub', 'b.pdf']
+    assert len(calls) == 2
+
+    files = list(utils.scan_files(root, ['*.epub', '*.pdf']))
+    books.books_meta_data(files, cache)
+    assert len(calls) == 2
+
+    with open(os.path.join(root, 'a.epub'), 'a') as fh:
+        fh.write('changed')
+    files = list(utils.scan_files(root, ['*.epub', '*.pdf']))
+    books.books_meta_data(files, cache)
+    assert calls[-1].endswith('a.epub') and len(calls) == 3
@@ -0,0 +1,73 @@
+import os
+import pickle
+
+from pyflash.cache import Cache
+
+
+def test_cache(tmpdir):
+    cache = Cache(str(tmpdir.join('cache.db')))
+    assert cache.get('omdbapi', 'Up') is None
+    cache.set('omdbapi', 'Up', {'Year': '2009'})
+    cache.set('omdbapi', 'Heat', None)
+    assert cache.get('omdbapi', 'Up') == {'Year': '2009'}
+    assert cache.get('omdbapi', 'Heat', 'missing') is None
+    assert cache.get('ebook_meta', 'Up') is None
+
+    cache.set('omdbapi', 'Old', 1, ttl=-1)
+    assert cache.get('omdbapi', 'Old', 'missing') == 'missing'
+
+    cache.close()
+    cache = Cache(str(tmpdir.join('cache.db')))
+    assert cache.get('omdbapi', 'Up') == {'Year': '2009'}
+
+
+def test_cache_eviction(tmpdir):
+    cache = Cache(str(tmpdir.join('cache.db')), max_entries=3)
+    for key in 'abc':
+        cache.set('ns', key, key)
+    cache.get('ns', 'a')
+    cache.set('ns', 'd', 'd')
+    assert sorted(cache.keys('ns')) == ['a', 'c', 'd']
+
+
+def test_cache_migrate(tmpdir):
+    pkl = tmpdir.join('pyflash.pkl')
+    pkl.write_binary(pickle.dumps({'omdbapi': {'Up': {'Year': '2009'}}}))
+    cache = Cache(str(tmpdir.join('cache.db')))
+    cache.migrate(str(pkl))
+    assert cache.get('omdbapi', 'Up') == {'Year': '2009'}
+    assert not pkl.exists()
+
+
+def test_cache_namespace_limits(tmpdir):
+    cache = Cache(str(tmpdir.join('cache.db')), max_entries=10, limits={'file_hash': 100})
+    cache.set('omdbapi', 'Up', 1)
+    cache.set_many('file_hash', ((i, i) for i in range(250)))
+    cache.set_many('ebook_meta', ((i, i) for i in range(25)))
+    # bulk namespaces evict their own entries only
+    assert cache.get('omdbapi', 'Up') == 1
+    assert len(cache.keys('file_hash')) == 90
+    assert len(cache.keys('ebook_meta')) == 9
+    assert cache.get_many('file_hash', range(150, 250)) == {str(i): i for i in range(160, 250)}
+
+
+def test_cache_replace_is_not_counted(tmpdir):
+    cache = Cache(str(tmpdir.join('cache.db')), max_entries=3)
+    for value in range(10):
+        cache.set('ns', 'a', value)
+        cache.set('ns', 'b', value)
+    cache.set('ns', 'c', 'c')
+    assert sorted(cache.keys('ns')) == ['a', 'b', 'c']
+    assert cache.get('ns', 'a') == 9
+
+
+def test_cache_after_fork(tmpdir):
+    cache = Cache(str(tmpdir.join('cache.db')))
+    cache.set('ns', 'parent', 1)
+    pid = os.fork()
+    if not pid:
+        # the child opens a connection of its own
+        cache.set('ns', 'child', cache.get('ns', 'parent') + 1)
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert cache.get('ns', 'child') == 2
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from pyflash import catalog
+
+
+@pytest.fixture
+def media(tmpdir, monkeypatch, fake_pool):
+    parsed = []
+
+    def parse(path):
+        parsed.append(os.path.basename(path))
+        return os.path.basename(path).split('.')[0], '{}'
+
+    fake_pool(catalog)
+    monkeypatch.setattr(catalog, 'parse', parse)
+    return catalog.Catalog(str(tmpdir.join('media.db'))), parsed
+
+
+def test_catalog_update(tmpdir, media, monkeypatch):
+    db, parsed = media
+    root = tmpdir.mkdir('videos')
+    root.join('Up.2009.mkv').write('')
+    root.join('notes.txt').write('')
+    root.mkdir('Heat').join('Heat.1995.mp4').write('')
+    root.mkdir('Heat0').join('Heat.1995.avi').write('')
+
+    assert db.update(str(root)) == 3
+    assert sorted(parsed) == ['Heat.1995.avi', 'Heat.1995.mp4', 'Up.2009.mkv']
+    assert db.update(str(root)) == 0
+    assert [row[1] for row in db.files(str(root.join('Heat')))] == ['Heat']
+
+    root.join('Heat').join('Heat.1995.mp4').remove()
+    root.join('Heat').join('Heat.1995.mkv').write('')
+    root.join('Heat0').remove()
+    assert db.update(str(root)) == 1
+    assert [os.path.relpath(row[0], str(root)) for row in db.files(str(root))] == [
+        os.path.join('Heat', 'Heat.1995.mkv'), 'Up.2009.mkv',
+    ]
+
+    # settled directories are not listed again
+    for directory in (root, root.join('Heat')):
+        os.utime(str(directory), (1000, 1000))
+    db.update(str(root))
+    monkeypatch.setattr(catalog.os, 'scandir', None)
+    assert db.update(str(root)) == 0
+
+    # files replaced in place are parsed again
+    root.join('Up.2009.mkv').write('new cut')
+    os.utime(str(root), (1000, 1000))
+    del parsed[:]
+    assert db.update(str(root)) == 1
+    assert parsed == ['Up.2009.mkv']
+
+
+def test_catalog_movies(tmpdir, media):
+    db, parsed = media
+    root = tmpdir.mkdir('videos')
+    root.join('Up.2009.mkv').write('')
+    root.join('Up.2009.srt.mkv').write('')
+    db.update(str(root))
+    db.set_movie('Up', {'imdbID': 'tt1049413', 'Title': 'Up'})
+    assert [row[2] for row in db.files(str(root))] == ['tt1049413', 'tt1049413']
+    assert db.movies(str(root)) == [{'imdbID': 'tt1049413', 'Title': 'Up'}] * 2
+    assert db.movies(str(tmpdir.join('other'))) == []
@@ -0,0 +1,124 @@
+import pathlib
+import shutil
+import tempfile
+
+import pytest
+
+from pyflash.commands import dev
+
+
+@pytest.fixture
+def project():
+    # importmagic skips paths that look like tests, so avoid pytest's tmpdir
+    path = tempfile.mkdtemp(prefix='pyflash')
+    yield pathlib.Path(path)
+    shutil.rmtree(path)
+
+
+def test_load_symbol_index(project, cache, monkeypatch, fake_pool):
+    (project / 'flashy.py').write_text('def zoom():\n    pass\n')
+    package = project / 'speedster'
+    package.mkdir()
+    (package / '__init__.py').write_text('')
+    (package / 'core.py').write_text('class Barry:\n    pass\n')
+
+    index = dev.load_symbol_index([str(project)], jobs=1)
+    assert index.symbol_scores('zoom')[0][1:] == ('flashy', 'zoom')
+    assert index.symbol_scores('Barry')[0][1:] == ('speedster.core', 'Barry')
+
+    indexed = []
+    index_entry = dev._index_entry
+    fake_pool(dev)
+    monkeypatch.setattr(dev, '_index_entry', lambda path: indexed.append(path) or index_entry(path))
+    (package / 'core.py').write_text('class Barry:\n    pass\n\n\nclass Iris:\n    pass\n')
+    index = dev.load_symbol_index([str(project)])
+    assert indexed == [str(package)]
+    assert index.symbol_scores('Iris')[0][1:] == ('speedster.core', 'Iris')
+
+
+def test_fix_imports_in_code_without_changes():
+    source = 'import os\n\nos.getcwd()\n'
+    assert dev.fix_imports_in_code(None, source) == source
+
+
+def test_fix_imports(project, cache, monkeypatch):
+    load_symbol_index = dev.load_symbol_index
+    monkeypatch.setattr(dev, 'load_symbol_index', lambda paths, jobs=None: load_symbol_index([str(project)], 1))
+    (project / 'clean.py').write_text('import os\n\nos.getcwd()\n')
+    package = project / 'pkg'
+    package.mkdir()
+    (package / 'unused.py').write_text('import os\nimport sys\n\nsys.exit()\n')
+
+    changed = dev.fix_imports(str(project), jobs=2)
+    assert changed == [str(package / 'unused.py')]
+    assert (package / 'unused.py').read_text() == 'import sys\n\n\nsys.exit()\n'
+
+    # files fixed during the run are checked once more on the next one
+    assert dev.python_files(str(project), since='last-run') == [str(package / 'unused.py')]
+    assert dev.fix_imports(str(project), since='last-run', jobs=1) == []
+    assert dev.python_files(str(project), since='last-run') == []
+    (project / 'clean.py').write_text('import os\n\nos.getcwd()\n\n')
+    assert dev.python_files(str(project), since='last-run') == [str(project / 'clean.py')]
+
+
+def test_pyformat(project, cache, monkeypatch, fake_pool):
+    (project / 'clean.py').write_text('x = 1\n')
+    (project / 'messy.py').write_text('x=1\n')
+
+    assert dev.pyformat(str(project), jobs=1) == [str(project / 'messy.py')]
+    assert (project / 'messy.py').read_text() == 'x = 1\n'
+
+    checked = []
+    fake_pool(dev)
+    monkeypatch.setattr(dev, 'pep8_file', lambda f, options: checked.append(f) or ('', False, 0))
+    (project / 'new.py').write_text('y = 2\n')
+    dev.pyformat(str(project))
+    assert checked == [str(project / 'new.py')]
+
+
+def test_pyformat_config_and_newlines(project, cache):
+    (project / 'setup.cfg').write_text('[pycodestyle]\nignore = E231\n')
+    (project / 'a.py').write_bytes(b'x = [1,2]\r\ny=1\r\n')
+    assert dev.pyformat(str(project), jobs=1) == [str(project / 'a.py')]
+    assert (project / 'a.py').read_bytes() == b'x = [1,2]\r\ny = 1\r\n'
+    assert dev.pyformat(str(project), jobs=1) == []
+
+    # clean files are checked again when the options change
+    (project / 'setup.cfg').write_text('[pycodestyle]\n')
+    dev._pep8_options.cache_clear()
+    assert dev.pyformat(str(project), jobs=1) == [str(project / 'a.py')]
+    assert (project / 'a.py').read_bytes() == b'x = [1, 2]\r\ny = 1\r\n'
+
+
+def test_fix_imports_loads_index_lazily(project, cache, monkeypatch):
+    def load_symbol_index(paths, jobs=None):
+        raise AssertionError('index loaded without a file to fix')
+
+    monkeypatch.setattr(dev, 'load_symbol_index', load_symbol_index)
+    (project / 'a.py').write_text('import os\n\nos.getcwd()\n')
+    (project / 'b.py').write_text('import sys\n\nsys.exit()\n')
+    assert dev.fix_imports(str(project), jobs=2) == []
+
+
+def test_fix_build_since(project, cache, monkeypatch):
+    calls = []
+    monkeypatch.setattr(dev, 'python_files', lambda root, since=None: calls.append(since) or [])
+    dev.fix_build(str(project), since='git', jobs=1)
+    assert calls == ['git', 'git']
+
+
+def test_git_changed_files_in_subdirectory(project):
+    sub = project / 'sub'
+    sub.mkdir()
+    (project / 'top.py').write_text('x = 1\n')
+    (sub / 'a.py').write_text('x = 1\n')
+    (sub / 'b.py').write_text('x = 1\n')
+    dev.u.run_shell_command('git -C {} init -q'.format(project))
+    dev.u.run_shell_command('git -C {} add .'.format(project))
+    dev.u.run_shell_command('git -C {} -c user.name=t -c user.email=t@t commit -qm init'.format(project))
+    (sub / 'a.py').write_text('x = 2\n')
+    (project / 'top.py').write_text('x = 2\n')
+    (sub / 'new.py').write_text('x = 1\n')
+
+    assert dev.git_changed_files(str(project)) == {str(project / 'top.py'), str(sub / 'a.py'), str(sub / 'new.py')}
+    assert dev.git_changed_files(str(sub)) == {str(sub / 'a.py'), str(sub / 'new.py')}
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from pyflash.commands import duplicates
+
+
+@pytest.fixture
+def files(tmpdir):
+    root = tmpdir.mkdir('files')
+    big = os.urandom(3 * duplicates.BLOCK_SIZE)
+    root.join('a.bin').write_binary(big)
+    root.mkdir('sub').join('b.bin').write_binary(big)
+    # same size, head and tail, different middle
+    middle = bytearray(big)
+    middle[len(big) // 2] ^= 1
+    root.join('c.bin').write_binary(bytes(middle))
+    root.join('x.txt').write('hello')
+    root.join('y.txt').write('hello')
+    root.join('z.txt').write('world')
+    os.link(str(root.join('x.txt')), str(root.join('x-link.txt')))
+    return root
+
+
+def test_find_duplicates(files, cache, monkeypatch):
+    root = str(files)
+    result = duplicates.find_duplicates([root], jobs=2)
+    assert result[0] == (3 * duplicates.BLOCK_SIZE, [os.path.join(root, 'a.bin'), os.path.join(root, 'sub', 'b.bin')])
+    # x.txt and x-link.txt are one file, whichever is seen first is reported
+    size, paths = result[1]
+    assert size == 5 and len(paths) == 2 and paths[1] == os.path.join(root, 'y.txt')
+    assert len(result) == 2
+
+    # second run is served from the cache
+    monkeypatch.setattr(duplicates, 'partial_hash', None)
+    monkeypatch.setattr(duplicates, 'full_hash', None)
+    assert duplicates.find_duplicates([root], jobs=2) == result
+
+
+def test_find_duplicates_action(files, cache):
+    root = str(files)
+    duplicates.find_duplicates_command([root], min_size=1024, action='delete')
+    assert files.join('a.bin').exists()
+    assert not files.join('sub', 'b.bin').exists()
+    assert files.join('y.txt').exists()
+
+    duplicates.find_duplicates_command([root], action='hardlink')
+    assert os.path.samefile(str(files.join('x.txt')), str(files.join('y.txt')))
+    assert duplicates.find_duplicates([root]) == []
@@ -0,0 +1,80 @@
+import struct
+import zipfile
+
+import pytest
+
+from pyflash import ebooks
+
+
+CONTAINER = """<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+OPF = """<?xml version="1.0"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="2.0">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:title>Flash Point</dc:title>
+    <dc:creator>Barry Allen</dc:creator>
+    <dc:creator>Iris West</dc:creator>
+    <dc:language>en</dc:language>
+  </metadata>
+</package>
+"""
+
+
+def test_epub_meta_data(tmpdir):
+    path = str(tmpdir.join('book.epub'))
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('META-INF/container.xml', CONTAINER)
+        zf.writestr('OEBPS/content.opf', OPF)
+
+    meta_data = ebooks.meta_data(path)
+    assert meta_data == {
+        'Title': 'Flash Point',
+        'Author(s)': 'Barry Allen & Iris West',
+        'Languages': 'en',
+    }
+
+
+def mobi(title, author):
+    author = author.encode('utf-8')
+    exth_record = struct.pack('>LL', ebooks.EXTH_AUTHOR, 8 + len(author)) + author
+    exth = b'EXTH' + struct.pack('>LL', 12 + len(exth_record), 1) + exth_record
+    mobi_length = 232
+    name_offset = 16 + mobi_length + len(exth)
+    header = bytearray(16 + mobi_length)
+    header[16:20] = b'MOBI'
+    header[20:32] = struct.pack('>LLL', mobi_length, 2, 65001)
+    header[84:92] = struct.pack('>LL', name_offset, len(title))
+    header[128:132] = struct.pack('>L', 0x40)
+    record = bytes(header) + exth + title.encode('utf-8')
+
+    palmdb = bytearray(78)
+    palmdb[60:68] = b'BOOKMOBI'
+    palmdb[76:78] = struct.pack('>H', 1)
+    offset = 78 + 8
+    return bytes(palmdb) + struct.pack('>LL', offset, 0) + record
+
+
+def test_mobi_meta_data(tmpdir):
+    path = tmpdir.join('book.mobi')
+    path.write_binary(mobi('Flash Point', 'Barry Allen'))
+
+    meta_data = ebooks.meta_data(str(path))
+    assert meta_data == {'Title': 'Flash Point', 'Author(s)': 'Barry Allen'}
+
+
+def test_unsupported_format(tmpdir):
+    path = tmpdir.join('book.djvu')
+    path.write('')
+    with pytest.raises(ebooks.UnsupportedFormat):
+        ebooks.meta_data(str(path))
+
+    path = tmpdir.join('broken.mobi')
+    path.write('not a mobi')
+    with pytest.raises(ebooks.UnsupportedFormat):
+        ebooks.meta_data(str(path))
@@ -0,0 +1,64 @@
+import ast
+
+from pyflash.commands import graph
+
+
+def test_get_imports():
+    source = 'import os\nfrom . import a\nfrom ..b import c\n\ndef f():\n    import json\n'
+    tree = ast.parse(source)
+    assert graph.get_imports(tree, 'pkg.sub') == ['os', 'pkg.sub.a', 'pkg.b.c', 'json']
+    assert graph.get_imports(tree, 'pkg.sub', lazy=False) == ['os', 'pkg.sub.a', 'pkg.b.c']
+
+
+def test_import_graph(tmpdir, cache, monkeypatch, fake_pool):
+    root = tmpdir.mkdir('project')
+    pkg = root.mkdir('app')
+    pkg.join('__init__.py').write('')
+    pkg.join('__main__.py').write('from . import cli\n')
+    pkg.join('cli.py').write('import click\nfrom .core import run\n\ndef main():\n    from . import heavy\n')
+    pkg.join('core.py').write('from app import models\n')
+    pkg.join('models.py').write('import app.core\nimport sqlite3\n')
+    pkg.join('heavy.py').write('import numpy\n')
+
+    report = graph.import_graph(str(root), jobs=1)
+    assert report['cycles'] == [['app.core', 'app.models']]
+    closure = report['entry_points']['app.__main__']
+    assert closure['modules'] == ['app', 'app.__main__', 'app.cli', 'app.core', 'app.models']
+    # sqlite3 is part of the standard library
+    assert closure['external'] == ['click']
+
+    modules, external = graph.ImportGraph(graph.project_imports(str(root))).closure('app.cli', lazy=True)
+    assert 'app.heavy' in modules and 'numpy' in external
+
+    parsed = []
+    fake_pool(graph)
+    monkeypatch.setattr(graph, 'parse_imports', lambda *args: parsed.append(args[0]) or ([], []))
+    pkg.join('heavy.py').write('import pandas\n')
+    graph.project_imports(str(root))
+    assert parsed == [str(pkg.join('heavy.py'))]
+
+
+def test_import_graph_of_a_package(tmpdir, cache):
+    pkg = tmpdir.mkdir('app')
+    pkg.join('__init__.py').write('')
+    pkg.join('utils.py').write('from .commands import c\n')
+    commands = pkg.mkdir('commands')
+    commands.join('__init__.py').write('')
+    commands.join('a.py').write('from .. import utils\n')
+    commands.join('b.py').write('from . import a\n')
+    commands.join('c.py').write('from .b import x\n')
+
+    report = graph.import_graph(str(pkg), jobs=1)
+    assert report['modules'] == 6
+    assert report['cycles'] == [['app.commands.a', 'app.utils', 'app.commands.c', 'app.commands.b']]
+
+
+def test_stdlib_modules_without_stdlib_module_names(monkeypatch):
+    monkeypatch.delattr(graph.sys, 'stdlib_module_names', raising=False)
+    graph.stdlib_modules.cache_clear()
+    try:
+        modules = graph.stdlib_modules()
+    finally:
+        graph.stdlib_modules.cache_clear()
+    assert {'os', 'json', 'sqlite3', 'sys', 'concurrent', '_sqlite3'} <= modules
+    assert 'click' not in modules and 'pytest' not in modules
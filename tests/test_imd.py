@@ -0,0 +1,107 @@
+import datetime as dt
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pyflash.commands import imd
+
+
+class IMDHandler(BaseHTTPRequestHandler):
+    requests = []
+    failures = 0
+    stalls = 0
+
+    def do_POST(self):
+        self.requests.append(('POST', self.path))
+        if IMDHandler.stalls:
+            IMDHandler.stalls -= 1
+            threading.Event().wait(1)
+            return
+        if IMDHandler.failures:
+            IMDHandler.failures -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        length = int(self.headers['Content-Length'])
+        body = self.rfile.read(length).decode('utf-8')
+        assert 'txtUserName=user' in body
+        state = self.path.split('State=')[1].split('&')[0]
+        link = 'http://{}:{}/csv/{}'.format(*self.server.server_address, state)
+        self.respond("<a href=\"javascript:DownloadData('{}')\">".format(link))
+
+    def do_GET(self):
+        self.requests.append(('GET', self.path))
+        self.respond('station,date\n{},2020-01-01\n'.format(self.path.split('/')[-1]))
+
+    def respond(self, body):
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), IMDHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    IMDHandler.requests = []
+    IMDHandler.failures = 0
+    IMDHandler.stalls = 0
+    yield 'http://{}:{}/'.format(*httpd.server_address)
+    httpd.shutdown()
+
+
+def test_date_chunks():
+    chunks = list(imd.date_chunks(dt.date(2020, 1, 1), dt.date(2020, 3, 1), 31))
+    assert chunks == [
+        (dt.date(2020, 1, 1), dt.date(2020, 1, 31)),
+        (dt.date(2020, 2, 1), dt.date(2020, 3, 1)),
+    ]
+
+
+def test_download_imd_data(server, tmpdir, monkeypatch):
+    monkeypatch.setenv('IMD_USERNAME', 'user')
+    monkeypatch.setenv('IMD_PASSWORD', 'secret')
+    data_dir = str(tmpdir)
+
+    failed = imd.download_imd_data('01/01/2020', '01/03/2020', '7', jobs=2, data_dir=data_dir, host=server)
+    assert not failed
+    assert sorted(os.listdir(data_dir)) == ['7_20200101_20200131.csv', '7_20200201_20200301.csv']
+    with open(os.path.join(data_dir, '7_20200101_20200131.csv')) as fh:
+        assert fh.read() == 'station,date\n7,2020-01-01\n'
+    assert len(IMDHandler.requests) == 4
+
+    imd.download_imd_data('01/01/2020', '01/03/2020', '7', data_dir=data_dir, host=server)
+    assert len(IMDHandler.requests) == 4
+
+
+def test_download_imd_data_retries(server, tmpdir, monkeypatch):
+    monkeypatch.setenv('IMD_USERNAME', 'user')
+    monkeypatch.setenv('IMD_PASSWORD', 'secret')
+    monkeypatch.setattr(imd.time, 'sleep', lambda seconds: None)
+    IMDHandler.failures = 1
+
+    failed = imd.download_imd_data('01/01/2020', '10/01/2020', '7', data_dir=str(tmpdir), host=server)
+    assert not failed
+    # the login is sent once more by download_chunk, never by the session
+    assert [method for method, _ in IMDHandler.requests] == ['POST', 'POST', 'GET']
+
+
+def test_download_imd_data_timeout(server, tmpdir, monkeypatch):
+    monkeypatch.setenv('IMD_USERNAME', 'user')
+    monkeypatch.setenv('IMD_PASSWORD', 'secret')
+    monkeypatch.setattr(imd.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(imd, 'TIMEOUT', 0.2)
+    IMDHandler.stalls = 1
+
+    failed = imd.download_imd_data('01/01/2020', '10/01/2020', '7', data_dir=str(tmpdir), host=server)
+    assert not failed
+    assert [method for method, _ in IMDHandler.requests] == ['POST', 'POST', 'GET']
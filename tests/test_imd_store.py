@@ -0,0 +1,75 @@
+import datetime as dt
+
+import numpy as np
+
+from pyflash.commands import imd_store
+
+
+CSV = """STATION,DATE,TIME,RAIN,TEMP
+Hyderabad,2020-01-01,00:00,1.5,20
+Hyderabad,2020-01-01,12:00,2.5,30
+Hyderabad,2020-01-02,00:00,,25
+Chennai,01/01/2020,00:00,0,28
+"""
+
+UPDATE = """STATION,DATE,TIME,RAIN,TEMP
+Hyderabad,2020-01-02,00:00,4,26
+Hyderabad,2020-01-03,00:00,1,22
+"""
+
+
+def test_ingest_and_query(tmpdir):
+    data_dir = tmpdir.mkdir('data')
+    store = str(tmpdir.join('store'))
+    data_dir.join('1_20200101_20200131.csv').write(CSV)
+    assert imd_store.ingest(str(data_dir), store) == 1
+    assert imd_store.ingest(str(data_dir), store) == 0
+    assert imd_store.stations(store) == ['Chennai', 'Hyderabad']
+
+    data_dir.join('1_20200102_20200131.csv').write(UPDATE)
+    assert imd_store.ingest(str(data_dir), store) == 1
+
+    index = imd_store.Station(store, 'Hyderabad').load()
+    assert len(index) == 4
+
+    days, rain = imd_store.query(store, 'Hyderabad', 'RAIN', agg='sum')
+    assert rain.tolist() == [4.0, 4.0, 1.0]
+    days, temp = imd_store.query(store, 'Hyderabad', 'TEMP', dt.date(2020, 1, 1), dt.date(2020, 1, 2), agg='max')
+    assert temp.tolist() == [30.0, 26.0]
+    days, temp = imd_store.query(store, 'Hyderabad', 'TEMP', agg='mean')
+    assert temp.tolist() == [25.0, 26.0, 22.0]
+    assert days[0] == np.datetime64('2020-01-01', 's').astype(np.int64)
+
+
+def test_aggregate_missing_values():
+    timestamps = np.array([0, 3600, 86400], dtype=np.int64)
+    values = np.array([np.nan, np.nan, 1], dtype=np.float32)
+    days, result = imd_store.aggregate(timestamps, values, 'mean')
+    assert np.isnan(result[0]) and result[1] == 1
+
+
+def test_ingest_writes_each_station_once(tmpdir, monkeypatch):
+    data_dir = tmpdir.mkdir('data')
+    store = str(tmpdir.join('store'))
+    data_dir.join('1_20200101_20200131.csv').write(CSV)
+    data_dir.join('1_20200102_20200131.csv').write(UPDATE)
+    data_dir.join('2_20200101_20200131.csv').write('STATION,DATETIME,HUMIDITY\nHyderabad,2020-01-05T06:00,80\n')
+
+    appends = []
+    append = imd_store.Station.append
+
+    def counting_append(self, timestamps, values):
+        appends.append(self.name)
+        append(self, timestamps, values)
+
+    monkeypatch.setattr(imd_store.Station, 'append', counting_append)
+    assert imd_store.ingest(str(data_dir), store) == 3
+    assert sorted(appends) == ['Chennai', 'Hyderabad']
+
+    station = imd_store.Station(store, 'Hyderabad')
+    assert station.variables == ['RAIN', 'TEMP', 'HUMIDITY']
+    index, humidity = station.load('HUMIDITY')
+    assert len(index) == 5
+    assert humidity[-1] == 80 and np.isnan(humidity[0])
+    days, rain = imd_store.query(store, 'Hyderabad', 'RAIN', agg='sum')
+    assert rain.tolist()[:3] == [4.0, 4.0, 1.0]
@@ -0,0 +1,57 @@
+import errno
+import os
+
+from pyflash import mover
+
+
+def test_move_files(tmpdir):
+    src = tmpdir.mkdir('src')
+    dst = tmpdir.mkdir('dst')
+    src.join('a.mp4').write('a')
+    src.join('b.mp4').write('b')
+    dst.join('b.mp4').write('old')
+    os.utime(str(src.join('a.mp4')), (1000, 1000))
+
+    moves = [(str(src.join(name)), str(dst) + os.sep) for name in ('a.mp4', 'b.mp4', 'missing.mp4')]
+    done = mover.move_files(moves)
+    assert done == [
+        (str(src.join('a.mp4')), str(dst.join('a.mp4'))),
+        (str(src.join('b.mp4')), str(dst.join('b-1.mp4'))),
+    ]
+    assert src.listdir() == []
+    assert dst.join('b.mp4').read() == 'old'
+    assert dst.join('b-1.mp4').read() == 'b'
+
+
+def test_move_files_across_devices(tmpdir, monkeypatch):
+    src = tmpdir.mkdir('src')
+    dst = tmpdir.join('new', 'books')
+    data = os.urandom(3 * 1024 * 1024 + 7)
+    src.join('a.pdf').write_binary(data)
+    os.chmod(str(src.join('a.pdf')), 0o640)
+    os.utime(str(src.join('a.pdf')), (1000, 1000))
+
+    real_stat = os.stat
+
+    def stat(path, *args, **kwargs):
+        result = real_stat(path, *args, **kwargs)
+        if str(path).startswith(str(src)):
+            extra = {name: getattr(result, name) for name in ('st_atime_ns', 'st_mtime_ns', 'st_ctime_ns')}
+            return os.stat_result((result.st_mode, result.st_ino, result.st_dev + 1) + tuple(result)[3:], extra)
+        return result
+
+    def copy_file_range(*args):
+        raise OSError(errno.EXDEV, 'cross device')
+
+    monkeypatch.setattr(mover.os, 'stat', stat)
+    monkeypatch.setattr(mover.os, 'copy_file_range', copy_file_range, raising=False)
+    done = mover.move_files([(str(src.join('a.pdf')), str(dst) + os.sep)])
+    monkeypatch.undo()
+
+    target = dst.join('a.pdf')
+    assert done == [(str(src.join('a.pdf')), str(target))]
+    assert not src.join('a.pdf').exists()
+    assert target.read_binary() == data
+    assert os.stat(str(target)).st_mtime == 1000
+    assert os.stat(str(target)).st_mode & 0o777 == 0o640
+    assert dst.listdir() == [target]
@@ -0,0 +1,44 @@
+import os
+
+from pyflash import catalog, utils
+from pyflash.commands import movies
+
+
+def test_movies_info(monkeypatch):
+    calls = []
+
+    def movie_info(title, session=None, limiter=None):
+        calls.append(title)
+        if title == 'Unknown':
+            raise ValueError(title)
+        return {'Title': title}
+
+    monkeypatch.setattr(utils, 'movie_info', movie_info)
+    info = movies.movies_info(['Up', 'Heat', 'Up', 'Unknown'], jobs=2)
+    assert sorted(calls) == ['Heat', 'Unknown', 'Up']
+    assert info == {'Up': {'Title': 'Up'}, 'Heat': {'Title': 'Heat'}, 'Unknown': None}
+
+
+def test_rate_movies(tmpdir, monkeypatch, capsys, fake_pool):
+    db = catalog.Catalog(str(tmpdir.join('media.db')))
+    fake_pool(catalog)
+    monkeypatch.setattr(catalog, 'parse', lambda path: (os.path.basename(path).split('.')[0], '{}'))
+    monkeypatch.setattr(utils, '_catalog', db)
+    root = tmpdir.mkdir('videos')
+    root.join('Up.2009.mkv').write('')
+    root.join('Up.2009.1080p.mp4').write('')
+
+    fetched = []
+
+    def movies_info(titles, jobs=None, rate=None):
+        fetched.append(sorted(titles))
+        ratings = [{'Source': 'Internet Movie Database', 'Value': '8.3/10'}]
+        return {'Up': {'imdbID': 'tt1049413', 'Title': 'Up', 'Year': '2009', 'Genre': 'Animation', 'Ratings': ratings}}
+
+    monkeypatch.setattr(movies, 'movies_info', movies_info)
+    movies.rate_movies(str(root), 'imdb', jobs=1)
+    movies.rate_movies(str(root), 'imdb', jobs=1)
+    assert fetched == [['Up']]
+    out = capsys.readouterr().out
+    # a row per video, as before the catalog
+    assert out.count('8.3/10') == 4
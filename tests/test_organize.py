@@ -0,0 +1,85 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from pyflash import inotify
+from pyflash.commands import organize
+
+
+FAKE_EXIFTOOL = """#!{python}
+import json, sys
+args = []
+for line in sys.stdin:
+    line = line.rstrip('\\n')
+    if line == 'False' and args[-1:] == ['-stay_open']:
+        break
+    if line.startswith('-execute'):
+        files = [a for a in args if not a.startswith('-') and a != '%Y-%m-%d_%H_%M_%S']
+        print(json.dumps([{{'SourceFile': f, 'CreateDate': '2020-01-02_03_04_05'}} for f in files]))
+        print('{{ready' + line[len('-execute'):] + '}}', flush=True)
+        args = []
+    else:
+        args.append(line)
+"""
+
+
+def test_exiftool(tmpdir):
+    executable = tmpdir.join('exiftool')
+    executable.write(FAKE_EXIFTOOL.format(python=sys.executable))
+    os.chmod(str(executable), stat.S_IRWXU)
+
+    with organize.ExifTool(str(executable)) as tool:
+        assert tool.create_dates(['a.jpg', 'b.jpg']) == {
+            'a.jpg': '2020-01-02_03_04_05',
+            'b.jpg': '2020-01-02_03_04_05',
+        }
+        assert tool.create_dates(['c.jpg']) == {'c.jpg': '2020-01-02_03_04_05'}
+
+
+def test_organize_photos(tmpdir, cache, monkeypatch):
+    tmpdir = tmpdir.mkdir('photos')
+    for name in ('IMG_1.JPG', 'IMG_2.jpg', 'IMG_3.jpg', '2019-05-05_10_00_00.jpg', 'notes.txt'):
+        tmpdir.join(name).write(name)
+    root = str(tmpdir)
+
+    read = []
+
+    def read_create_dates(files, jobs=None):
+        read.append(sorted(os.path.basename(f) for f in files))
+        dates = {f: '2020-01-02_03_04_05' for f in files}
+        dates.pop(os.path.join(root, 'IMG_3.jpg'), None)
+        return dates
+
+    monkeypatch.setattr(organize, 'read_create_dates', read_create_dates)
+    plan = organize.organize_photos(root, dry_run=True)
+    assert read == [['IMG_1.JPG', 'IMG_2.jpg', 'IMG_3.jpg']]
+    assert plan == [
+        (os.path.join(root, 'IMG_1.JPG'), os.path.join(root, '2020-01-02_03_04_05.jpg')),
+        (os.path.join(root, 'IMG_2.jpg'), os.path.join(root, '2020-01-02_03_04_05-1.jpg')),
+    ]
+    assert tmpdir.join('IMG_1.JPG').exists()
+
+    organize.organize_photos(root)
+    assert read[-1] == ['IMG_1.JPG', 'IMG_2.jpg']
+    assert sorted(os.listdir(root)) == [
+        '2019-05-05_10_00_00.jpg', '2020-01-02_03_04_05-1.jpg', '2020-01-02_03_04_05.jpg',
+        'IMG_3.jpg', 'notes.txt',
+    ]
+
+
+@pytest.mark.skipif(not inotify.available(), reason='needs inotify')
+def test_inotify(tmpdir):
+    downloads = tmpdir.mkdir('downloads')
+    with inotify.Inotify() as notifier:
+        notifier.add_watch(str(downloads), inotify.IN_CLOSE_WRITE | inotify.IN_MOVED_TO)
+        assert notifier.read(0) == []
+        downloads.join('a.pdf').write('a')
+        tmpdir.join('b.mp4.part').write('b')
+        tmpdir.join('b.mp4.part').rename(downloads.join('b.mp4'))
+        events = notifier.read(1)
+    assert events == [
+        (str(downloads), inotify.IN_CLOSE_WRITE, 'a.pdf'),
+        (str(downloads), inotify.IN_MOVED_TO, 'b.mp4'),
+    ]
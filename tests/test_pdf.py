@@ -0,0 +1,34 @@
+import PyPDF2
+
+from pyflash.commands import pdf
+
+
+def make_pdf(path, pages, width=200, height=100):
+    writer = PyPDF2.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width, height)
+    with open(path, 'wb') as fh:
+        writer.write(fh)
+
+
+def boxes(path):
+    return [list(map(float, page.mediabox)) for page in PyPDF2.PdfReader(path).pages]
+
+
+def test_split_pdf(tmpdir):
+    src = str(tmpdir.join('scan.pdf'))
+    dst = str(tmpdir.join('split.pdf'))
+    make_pdf(src, 5)
+
+    assert pdf.split_pdf(src, dst, jobs=2, chunk_size=2) == 5
+    assert boxes(dst) == [[0, 0, 100, 100], [100, 0, 200, 100]] * 5
+
+
+def test_split_pdfs(tmpdir):
+    src = tmpdir.mkdir('src')
+    make_pdf(str(src.join('a.pdf')), 2, width=100, height=200)
+    make_pdf(str(src.join('b.pdf')), 3)
+
+    assert pdf.split_pdfs(str(src), str(tmpdir.join('out')), jobs=2) == 5
+    assert boxes(str(tmpdir.join('out', 'a.pdf'))) == [[0, 100, 100, 200], [0, 0, 100, 100]] * 2
+    assert len(boxes(str(tmpdir.join('out', 'b.pdf')))) == 6
@@ -0,0 +1,33 @@
+from pyflash.commands import profile
+
+
+OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     _io
+import time:        50 |        150 |   io
+import time:       200 |        200 |   json.decoder
+import time:       300 |        650 | json
+import time:        10 |         10 | sys
+"""
+
+
+def test_parse_importtime():
+    roots = profile.parse_importtime(OUTPUT)
+    assert [node['name'] for node in roots] == ['json', 'sys']
+    json_node = roots[0]
+    assert [child['name'] for child in json_node['children']] == ['io', 'json.decoder']
+    assert json_node['children'][0]['children'][0]['name'] == '_io'
+
+    modules = profile.flatten(roots)
+    assert modules['_io'] == {'self': 100, 'cumulative': 100, 'parent': 'io'}
+    assert modules['json']['parent'] is None
+
+
+def test_command_modules():
+    assert profile.command_modules('organize-books') == ['pyflash.cli', 'pyflash.commands.books']
+    assert profile.command_modules('no-such-command') is None
+
+
+def test_deferrable():
+    # dev only uses importmagic inside functions, cli uses click at module level
+    assert profile.deferrable('pyflash.commands.dev', 'importmagic')
+    assert not profile.deferrable('pyflash.cli', 'click')
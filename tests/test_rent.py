@@ -0,0 +1,48 @@
+import PyPDF2
+
+from pyflash.commands import rent
+
+
+CSV = """name,amount,owner_name,address,year
+Raj Kumar,"8,000",Sekhar Raju,"#26, Gandhi Road, Bangalore",2016-17
+Asha (Rao),"12,500",Sekhar Raju,"#27, Gandhi Road, Bangalore",2017
+"""
+
+
+def test_batch_rent_receipts(tmpdir, fake_pool):
+    fake_pool(rent)
+    tenants = tmpdir.join('tenants.csv')
+    tenants.write(CSV)
+
+    combined = str(tmpdir.join('receipts.pdf'))
+    rent.batch_rent_receipts(str(tenants), combined=combined)
+    reader = PyPDF2.PdfReader(combined)
+    assert len(reader.pages) == 24
+    text = ' '.join(reader.pages[9].extract_text().split())
+    assert 'RENT RECEIPT - January 2017' in text
+    assert 'Received sum of Rs. 8,000 from Raj Kumar' in text
+    assert '01 January 2017 to 31 January 2017' in text
+    assert 'Asha (Rao)' in reader.pages[23].extract_text()
+
+    output_dir = tmpdir.join('receipts')
+    rent.batch_rent_receipts(str(tenants), str(output_dir))
+    assert len(output_dir.listdir()) == 24
+    assert output_dir.join('rent_receipt_asha_rao_2018_03.pdf').exists()
+
+
+def test_batch_rent_receipts_unsupported_text(tmpdir, caplog):
+    tenants = tmpdir.join('tenants.csv')
+    tenants.write(CSV + 'రాజ్ కుమార్,"8,000",Sekhar Raju,"#28, Gandhi Road, Bangalore",2017\n')
+    output_dir = tmpdir.join('receipts')
+    rent.batch_rent_receipts(str(tenants), str(output_dir))
+    assert not output_dir.exists()
+    assert 'line 4' in caplog.text and 'standard PDF fonts' in caplog.text
+
+
+def test_batch_rent_receipts_unsupported_amount(tmpdir, caplog):
+    tenants = tmpdir.join('tenants.csv')
+    tenants.write(CSV + 'Ravi,₹8000,Sekhar Raju,"#28, Gandhi Road, Bangalore",2017\n')
+    output_dir = tmpdir.join('receipts')
+    rent.batch_rent_receipts(str(tenants), str(output_dir))
+    assert not output_dir.exists()
+    assert 'line 4' in caplog.text and "'₹'" in caplog.text
@@ -0,0 +1,35 @@
+import itertools
+import random
+
+from PIL import Image
+
+from pyflash.commands import similar
+
+
+def test_hamming_index():
+    rng = random.Random(1)
+    values = [rng.getrandbits(64) for _ in range(300)]
+    values += [v ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for v in values[:50]]
+    expected = {
+        (i, j) for i, j in itertools.combinations(range(len(values)), 2)
+        if bin(values[i] ^ values[j]).count('1') <= 4
+    }
+    pairs = {tuple(sorted(p)) for p in similar.HammingIndex(values, 4).pairs(block=16)}
+    assert pairs == expected
+    assert len(expected) >= 50
+
+
+def test_find_similar_photos(tmpdir, cache, monkeypatch):
+    photos = tmpdir.mkdir('photos')
+    img = Image.new('L', (640, 480))
+    img.putdata([(x * 255 // 640 + y * 97 // 480) % 256 for y in range(480) for x in range(640)])
+    img.save(str(photos.join('a.png')))
+    img.resize((320, 240)).save(str(photos.join('a-small.jpg')), quality=60)
+    img.transpose(Image.FLIP_LEFT_RIGHT).save(str(photos.join('b.png')))
+    photos.join('broken.jpg').write('not a photo')
+
+    groups = similar.find_similar_photos([str(photos)], jobs=1)
+    assert groups == [[str(photos.join('a-small.jpg')), str(photos.join('a.png'))]]
+
+    monkeypatch.setattr(similar, 'dhash', None)
+    assert similar.find_similar_photos([str(photos)], jobs=1) == groups
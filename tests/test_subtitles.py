@@ -0,0 +1,45 @@
+import os
+import struct
+
+from pyflash.commands import subtitles
+
+
+def opensubtitles_hash(path):
+    # straight from the OpenSubtitles wiki
+    size = os.path.getsize(path)
+    value = size
+    with open(path, 'rb') as fh:
+        for offset in (0, size - 65536):
+            fh.seek(offset)
+            for _ in range(65536 // 8):
+                value = (value + struct.unpack('<Q', fh.read(8))[0]) & 0xFFFFFFFFFFFFFFFF
+    return '%016x' % value
+
+
+def test_hash_opensubtitles(tmpdir):
+    video = tmpdir.join('movie.mkv')
+    video.write_binary(os.urandom(3 * subtitles.HASH_BLOCK + 123))
+    path = str(video)
+    assert subtitles.hash_opensubtitles(path, os.path.getsize(path)) == opensubtitles_hash(path)
+    assert subtitles.hash_opensubtitles(path, 1000) is None
+
+
+def test_videos_without_subtitles(tmpdir):
+    for name in ['Movie.mkv', 'Movie.en.srt', 'Show.S01E01.mp4', 'Show.S01E01.srt', 'Other.avi', 'Other.nfo',
+                 'notes.txt']:
+        tmpdir.join(name).write('')
+    tmpdir.mkdir('sub').join('Clip.mov').write('')
+
+    found = sorted(entry.name for entry in subtitles.videos_without_subtitles(str(tmpdir)))
+    assert found == ['Clip.mov', 'Other.avi']
+
+
+def test_videos_to_search_skips_recent_misses(tmpdir, cache):
+    for name in ['a.mkv', 'b.mkv', 'c.mkv']:
+        tmpdir.join(name).write('')
+    cache.set('subtitle_misses', str(tmpdir.join('a.mkv')), True, ttl=subtitles.MISS_TTL)
+    # a miss older than MISS_TTL is searched again
+    cache.set('subtitle_misses', str(tmpdir.join('b.mkv')), True, ttl=-1)
+
+    found = sorted(entry.name for entry in subtitles.videos_to_search(str(tmpdir), cache))
+    assert found == ['b.mkv', 'c.mkv']
@@ -0,0 +1,63 @@
+import os
+
+from pyflash import mover, utils
+
+
+def touch(*parts):
+    path = os.path.join(*parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'w').close()
+    return path
+
+
+def test_scan_files(tmpdir):
+    root = str(tmpdir)
+    touch(root, 'a.epub')
+    touch(root, 'books', 'b.pdf')
+    touch(root, 'books', 'c.txt')
+    touch(root, '.hidden', 'd.pdf')
+    touch(root, 'skip', 'e.pdf')
+
+    files = utils.scan_files(root, ['*.epub', '*.pdf'], exclude={'skip'})
+    names = sorted(entry.name for entry in files)
+    assert names == ['a.epub', 'b.pdf']
+
+    files = utils.scan_files(root, hidden=True)
+    names = sorted(entry.name for entry in files)
+    assert names == ['a.epub', 'b.pdf', 'c.txt', 'd.pdf', 'e.pdf']
+
+    os.symlink(os.path.join(root, 'missing.pdf'), os.path.join(root, 'broken.pdf'))
+    names = sorted(entry.name for entry in utils.scan_files(root, ['*.pdf'], exclude={'skip'}))
+    assert names == ['b.pdf']
+
+
+def test_matched_files(tmpdir):
+    root = str(tmpdir)
+    path = touch(root, 'x', 'y', 'book.mobi')
+    assert list(utils.matched_files(['*.mobi'], root)) == [path]
+
+
+def test_convert_books(tmpdir, monkeypatch):
+    root = str(tmpdir)
+    good = touch(root, 'good.epub')
+    bad = touch(root, 'bad.epub')
+    done = touch(root, 'done.epub')
+    os.utime(done, (0, 0))
+    touch(root, 'done.mobi')
+
+    commands = []
+
+    def check_output(command, **kwargs):
+        commands.append(command)
+        if command[1] == bad:
+            raise utils.subprocess.CalledProcessError(1, command)
+        open(command[2], 'w').close()
+
+    moved = []
+    monkeypatch.setattr(utils.subprocess, 'check_output', check_output)
+    monkeypatch.setattr(mover, 'move_files', lambda moves: moved.extend(src for src, dst in moves))
+
+    converted = utils.convert_books(root, jobs=2)
+    assert sorted(converted) == [os.path.join(root, 'done.mobi'), os.path.join(root, 'good.mobi')]
+    assert sorted(moved) == [done, good]
+    assert sorted(c[1] for c in commands) == [bad, good]